@@ -1,7 +1,9 @@
-from flask import Flask, jsonify, g, send_from_directory, request
+from flask import Flask, jsonify, g
 from flask_cors import CORS
 import os
 import atexit
+from routes.batch import batch_bp
+from routes.bootstrap import bootstrap_bp
 from routes.colleges import colleges_bp
 from routes.programs import programs_bp
 from routes.students import students_bp
@@ -9,14 +11,23 @@ from routes.users import users_bp
 from routes.metrics import metrics_bp
 from services.auth import get_user_from_request
 from services.database import close_pool
+from services.instrumentation import start_request, finish_request
+from services import static_assets
+from services.compression import compress_response
+from services.json_provider import FastJSONProvider
 
 CLIENT_BUILD_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'client', 'out'))
+# Built once at startup; restart the server after rebuilding the client
+STATIC_MANIFEST = static_assets.build_manifest(CLIENT_BUILD_PATH)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # Register cleanup function to close database pool on shutdown
 atexit.register(close_pool)
 
+app.register_blueprint(batch_bp)
+app.register_blueprint(bootstrap_bp)
 app.register_blueprint(colleges_bp)
 app.register_blueprint(metrics_bp)
 app.register_blueprint(programs_bp)
@@ -29,6 +40,12 @@ CORS(
     origins=["http://localhost:3000", "http://127.0.0.1:3000"]
 )
 
+# Per-endpoint latency, status, size and DB timing (exported at /api/metrics/prometheus)
+app.before_request(start_request)
+app.after_request(finish_request)
+# Registered after instrumentation so it runs first and the recorded size is the compressed one
+app.after_request(compress_response)
+
 @app.before_request
 def load_user():
     g.current_user = get_user_from_request()
@@ -37,7 +54,7 @@ def load_user():
 def home():
     return jsonify({"message": "wakey wakey flask is awakey"})
 
-# Serve static files and handle SPA routing
+# Serve static files and handle SPA routing from the startup manifest
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_static(path):
@@ -45,30 +62,10 @@ def serve_static(path):
     if path.startswith('api/') or path == 'api':
         return jsonify({"error": "Not found"}), 404
     
-    # Normalize path separators for Windows
-    path = path.replace('\\', '/')
-    
-    # Remove trailing slash for file lookup
-    clean_path = path.rstrip('/')
-    
-    # Try to serve the exact file (for assets like .js, .css, images)
-    full_path = os.path.join(CLIENT_BUILD_PATH, clean_path)
-    if os.path.isfile(full_path):
-        directory = os.path.dirname(full_path)
-        filename = os.path.basename(full_path)
-        return send_from_directory(directory, filename)
-    
-    # For routes like /dashboard or /dashboard/, serve /dashboard/index.html
-    index_path = os.path.join(CLIENT_BUILD_PATH, clean_path, 'index.html')
-    if os.path.isfile(index_path):
-        return send_from_directory(os.path.join(CLIENT_BUILD_PATH, clean_path), 'index.html')
-    
-    # For root path
-    if not clean_path:
-        return send_from_directory(CLIENT_BUILD_PATH, 'index.html')
-    
-    # Fallback to root index.html for client-side routing
-    return send_from_directory(CLIENT_BUILD_PATH, 'index.html')
+    asset = static_assets.resolve(STATIC_MANIFEST, path)
+    if asset is None:
+        return jsonify({"error": "Not found"}), 404
+    return static_assets.serve(asset)
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,283 @@
+"""
+End-to-end HTTP load test.
+
+Seeds a local PostgreSQL database (see loadtest/seed.py), starts the API
+against it in a subprocess, drives a weighted mix of endpoints from many
+concurrent clients for a fixed duration and prints a JSON report with
+throughput and p50/p95/p99 latency per operation. Runs are reproducible for a
+given --seed, scenario and scale, and the report records the git commit so
+results can be compared across commits.
+
+Usage (from the server/ directory):
+    python -m loadtest.run --database-url postgresql://localhost/maktab_load \\
+        --scale 100k --scenario mixed --clients 50 --duration 60 --output run.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+import jwt
+from loadtest import seed as seeding
+
+SERVER_DIR = seeding.SERVER_DIR
+JWT_SECRET = "loadtest-secret-loadtest-secret-loadtest"
+
+# Operation weights for each scenario
+SCENARIOS = {
+    "read_heavy": {
+        "list_students": 40, "counts": 25, "daily_metrics": 20, "get_colleges": 10, "create_student": 5,
+    },
+    "mixed": {
+        "list_students": 30, "counts": 15, "daily_metrics": 15, "get_colleges": 10,
+        "create_student": 15, "update_student": 10, "bulk_delete_students": 5,
+    },
+    "write_heavy": {
+        "list_students": 10, "counts": 10, "create_student": 40, "update_student": 30, "bulk_delete_students": 10,
+    },
+}
+
+
+def _make_token():
+    now = int(time.time())
+    return jwt.encode(
+        {"sub": "loadtest", "email": "loadtest@example.com", "aud": "authenticated",
+         "iat": now, "exp": now + 24 * 3600},
+        JWT_SECRET, algorithm="HS256",
+    )
+
+
+class Client:
+    """One simulated client: a keep-alive connection plus its own RNG and created-student list."""
+
+    def __init__(self, index, port, num_students, token, rng_seed):
+        self.index = index
+        self.port = port
+        self.num_students = num_students
+        self.rng = random.Random(rng_seed * 1000 + index)
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        self.auth = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        self.created = []
+        self.counter = 0
+
+    def request(self, method, path, body=None, auth=False):
+        headers = dict(self.auth) if auth else {}
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            return 0
+
+    def random_student_body(self, id_no):
+        codes = seeding.program_codes()
+        return {
+            "idNo": id_no,
+            "firstName": self.rng.choice(seeding.FIRST_NAMES),
+            "lastName": self.rng.choice(seeding.LAST_NAMES),
+            "course": self.rng.choice(codes),
+            "year": self.rng.randint(1, 4),
+            "gender": self.rng.choice(seeding.GENDERS),
+            "photo_path": "",
+        }
+
+    # Operations ---------------------------------------------------------
+
+    def list_students(self):
+        return self.request("GET", "/api/students/?limit=50")
+
+    def counts(self):
+        return self.request("GET", "/api/metrics/counts")
+
+    def daily_metrics(self):
+        return self.request("GET", "/api/metrics/daily")
+
+    def get_colleges(self):
+        return self.request("GET", "/api/colleges/")
+
+    def create_student(self):
+        self.counter += 1
+        id_no = f"L{self.index:04d}-{self.counter:07d}"
+        status = self.request("POST", "/api/students/", self.random_student_body(id_no), auth=True)
+        if status == 201:
+            self.created.append(id_no)
+        return status
+
+    def update_student(self):
+        id_no = seeding.student_id(self.rng.randrange(self.num_students))
+        return self.request("PUT", f"/api/students/{id_no}", self.random_student_body(id_no), auth=True)
+
+    def bulk_delete_students(self):
+        # Only delete rows this client created, so the seeded data set stays stable
+        if not self.created:
+            return self.create_student()
+        ids, self.created = self.created[:20], self.created[20:]
+        return self.request("POST", "/api/students/bulk-delete", {"ids": ids}, auth=True)
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _summarize(latencies, errors, elapsed):
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0,
+        "p50_ms": round(_percentile(values, 50) * 1000, 3) if values else None,
+        "p95_ms": round(_percentile(values, 95) * 1000, 3) if values else None,
+        "p99_ms": round(_percentile(values, 99) * 1000, 3) if values else None,
+        "max_ms": round(values[-1] * 1000, 3) if values else None,
+    }
+
+
+def drive(port, scenario, clients, duration, warmup, num_students, rng_seed):
+    """Run `clients` concurrent clients against the server and return the report body."""
+    weights = SCENARIOS[scenario]
+    operations = list(weights)
+    token = _make_token()
+    results = {op: {"latencies": [], "errors": 0} for op in operations}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(clients + 1)
+    measure_from = [0.0]
+    stop_at = [0.0]
+
+    def worker(index):
+        client = Client(index, port, num_students, token, rng_seed)
+        local = {op: ([], 0) for op in operations}
+        start_barrier.wait()
+        while True:
+            op = client.rng.choices(operations, weights=[weights[o] for o in operations])[0]
+            started = time.perf_counter()
+            if started >= stop_at[0]:
+                break
+            status = getattr(client, op)()
+            finished = time.perf_counter()
+            if started < measure_from[0]:
+                continue
+            latencies, errors = local[op]
+            if 200 <= status < 400:
+                latencies.append(finished - started)
+            else:
+                local[op] = (latencies, errors + 1)
+        with lock:
+            for op, (latencies, errors) in local.items():
+                results[op]["latencies"].extend(latencies)
+                results[op]["errors"] += errors
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    now = time.perf_counter()
+    measure_from[0] = now + warmup
+    stop_at[0] = now + warmup + duration
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+
+    all_latencies = [l for r in results.values() for l in r["latencies"]]
+    return {
+        "overall": _summarize(all_latencies, sum(r["errors"] for r in results.values()), duration),
+        "operations": {
+            op: _summarize(r["latencies"], r["errors"], duration) for op, r in results.items()
+        },
+    }
+
+
+def start_server(database_url, port, mode):
+    """Start the API in a subprocess and wait until it answers."""
+    env = dict(
+        os.environ, DATABASE_URL=database_url, SUPABASE_JWT_SECRET=JWT_SECRET,
+        FLASK_DEBUG="0", PORT=str(port),
+    )
+    if mode == "gevent":
+        command = [sys.executable, "serve_async.py"]
+    else:
+        command = [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(port),
+                   "--no-reload", "--no-debugger", "--with-threads"]
+    process = subprocess.Popen(
+        command, cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"API server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/home")
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit("API server did not start within 30s")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load test for the Maktab API")
+    parser.add_argument("--database-url", required=True, help="local, disposable PostgreSQL database")
+    parser.add_argument("--scale", type=seeding.parse_scale, default="1k", help="1k, 100k, 1m or a student count")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before measuring")
+    parser.add_argument("--server", choices=("flask", "gevent"), default="flask")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        seeding.seed(args.database_url, args.scale, args.seed)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    process = start_server(args.database_url, args.port, args.server)
+    try:
+        body = drive(args.port, args.scenario, args.clients, args.duration, args.warmup, args.scale, args.seed)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    report = {
+        "commit": _git_commit(),
+        "started_at": started_at,
+        "config": {
+            "scenario": args.scenario, "students": args.scale, "clients": args.clients,
+            "duration_s": args.duration, "warmup_s": args.warmup, "server": args.server, "seed": args.seed,
+        },
+        **body,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
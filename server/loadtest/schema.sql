@@ -0,0 +1,37 @@
+-- Minimal stand-in for the Supabase schema, used only by the load-test harness
+-- against a disposable local database. scripts/migrations/ is applied on top.
+
+DROP TABLE IF EXISTS public.students, public.programs, public.colleges, public.users,
+    public.table_versions, public.table_row_counts, public.daily_row_counts,
+    public.schema_migrations CASCADE;
+
+CREATE TABLE public.colleges (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE public.programs (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    college_code TEXT REFERENCES public.colleges (code) ON UPDATE CASCADE ON DELETE CASCADE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE public.students (
+    "idNo" TEXT PRIMARY KEY,
+    "firstName" TEXT NOT NULL,
+    "lastName" TEXT NOT NULL,
+    course TEXT REFERENCES public.programs (code) ON UPDATE CASCADE ON DELETE SET NULL,
+    year INTEGER,
+    gender TEXT,
+    photo_path TEXT,
+    college_code TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE public.users (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    email TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,132 @@
+"""
+Reset a local PostgreSQL database to the load-test schema and fill it with
+synthetic colleges, programs, students and users using COPY.
+
+Usage (from the server/ directory):
+    python -m loadtest.seed --database-url postgresql://localhost/maktab_load --students 100000
+"""
+import argparse
+import io
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+import psycopg2
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+FIRST_NAMES = [
+    "John", "Jane", "Alex", "Chris", "Pat", "Sam", "Taylor", "Jordan", "Casey", "Drew",
+    "Jamie", "Morgan", "Aiden", "Liam", "Noah", "Emma", "Olivia", "Sophia", "Mia", "Lucas"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Garcia", "Lee", "Martinez", "Brown", "Davis", "Lopez", "Miller", "Wilson",
+    "Anderson", "Thomas", "Hernandez", "Moore", "Martin", "Jackson", "Thompson", "White", "Harris", "Clark"
+]
+GENDERS = ["Male", "Female"]
+
+# Named scales accepted by --scale
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+NUM_COLLEGES = 10
+PROGRAMS_PER_COLLEGE = 5
+NUM_USERS = 100
+CREATED_AT_SPREAD_DAYS = 60
+
+
+def student_id(i):
+    """Deterministic idNo for the i-th seeded student."""
+    return f"S{i:07d}"
+
+
+def program_codes():
+    return [f"P{c:02d}{p}" for c in range(NUM_COLLEGES) for p in range(PROGRAMS_PER_COLLEGE)]
+
+
+def _copy(cur, table, columns, rows, chunk=50_000):
+    """COPY rows into `table`, buffering `chunk` rows at a time."""
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    batch = []
+
+    def flush():
+        buffer = io.StringIO("".join(batch))
+        cur.copy_expert(f"COPY {table} ({column_list}) FROM STDIN", buffer)
+        batch.clear()
+
+    for row in rows:
+        batch.append("\t".join("\\N" if v is None else str(v) for v in row) + "\n")
+        if len(batch) >= chunk:
+            flush()
+    if batch:
+        flush()
+
+
+def seed(database_url, num_students, rng_seed=42):
+    """Recreate the schema, apply migrations and load synthetic data."""
+    if "supabase" in database_url:
+        sys.exit("Refusing to reset what looks like a Supabase database; use a local instance")
+
+    rng = random.Random(rng_seed)
+    now = datetime.now(timezone.utc)
+
+    def created_at():
+        return (now - timedelta(seconds=rng.randrange(CREATED_AT_SPREAD_DAYS * 86400))).isoformat()
+
+    conn = psycopg2.connect(database_url)
+    with conn, conn.cursor() as cur:
+        with open(SCHEMA_PATH, encoding="utf-8") as f:
+            cur.execute(f.read())
+
+        _copy(cur, "colleges", ("code", "name", "created_at"), (
+            (f"C{c:02d}", f"College {c}", created_at()) for c in range(NUM_COLLEGES)
+        ))
+        codes = program_codes()
+        _copy(cur, "programs", ("code", "name", "college_code", "created_at"), (
+            (code, f"Program {code}", f"C{code[1:3]}", created_at()) for code in codes
+        ))
+        _copy(cur, "users", ("email", "created_at"), (
+            (f"user{u}@example.com", created_at()) for u in range(NUM_USERS)
+        ))
+
+        def students():
+            for i in range(num_students):
+                course = rng.choice(codes)
+                yield (
+                    student_id(i), rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), course,
+                    rng.randint(1, 4), rng.choice(GENDERS), "", f"C{course[1:3]}", created_at(),
+                )
+        _copy(cur, "students", (
+            "idNo", "firstName", "lastName", "course", "year", "gender", "photo_path",
+            "college_code", "created_at"
+        ), students())
+    conn.close()
+
+    # Migrations backfill counters/rollups from the seeded rows
+    env = dict(os.environ, DATABASE_URL=database_url)
+    subprocess.run([sys.executable, "-m", "scripts.migrate"], cwd=SERVER_DIR, env=env, check=True)
+
+    conn = psycopg2.connect(database_url)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("VACUUM ANALYZE")
+    conn.close()
+
+
+def parse_scale(value):
+    """Accept a named scale (1k/100k/1m) or a plain student count."""
+    return SCALES.get(value.lower()) or int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--students", "--scale", dest="students", type=parse_scale, default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    seed(args.database_url, args.students, args.seed)
+    print(f"Seeded {args.students} students into {args.database_url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from repositories import version_repository
 from repositories import college_repository
 from repositories import program_repository
 from repositories import student_repository
@@ -10,4 +11,5 @@ __all__ = [
     "student_repository",
     "user_repository",
     "metrics_repository",
+    "version_repository",
 ]
\ No newline at end of file
@@ -1,16 +1,37 @@
-from services.database import get_db_cursor
+from repositories import version_repository
+from psycopg2.extras import execute_values
+from services.database import get_db_cursor, stream_query
 
 
 def get_all():
     """Get all colleges ordered by code."""
-    with get_db_cursor() as cur:
+    with get_db_cursor(readonly=True) as cur:
         cur.execute('SELECT code, name FROM colleges ORDER BY code')
         return cur.fetchall()
 
 
+def iter_all(batch_size=1000):
+    """Stream all colleges ordered by code from a server-side cursor."""
+    return stream_query('SELECT code, name FROM colleges ORDER BY code', batch_size=batch_size)
+
+
+def get_counts():
+    """Get each college's program and student counts, aggregated once per table."""
+    with get_db_cursor(readonly=True) as cur:
+        cur.execute('''
+            SELECT c.code, COALESCE(p.count, 0) AS program_count, COALESCE(s.count, 0) AS student_count 
+            FROM colleges c 
+            LEFT JOIN (SELECT college_code, COUNT(*) AS count FROM programs GROUP BY college_code) p 
+                ON p.college_code = c.code 
+            LEFT JOIN (SELECT college_code, COUNT(*) AS count FROM students GROUP BY college_code) s 
+                ON s.college_code = c.code
+        ''')
+        return cur.fetchall()
+
+
 def get_by_code(code):
     """Get a single college by code."""
-    with get_db_cursor() as cur:
+    with get_db_cursor(readonly=True) as cur:
         cur.execute('SELECT code, name FROM colleges WHERE code = %s', (code,))
         return cur.fetchone()
 
@@ -22,7 +43,9 @@ def create(code, name):
             'INSERT INTO colleges (code, name) VALUES (%s, %s) RETURNING code, name',
             (code, name)
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+        version_repository.bump(cur, "colleges")
+        return row
 
 
 def update(code, new_code, new_name):
@@ -32,7 +55,9 @@ def update(code, new_code, new_name):
             'UPDATE colleges SET code = %s, name = %s WHERE code = %s RETURNING code, name',
             (new_code, new_name, code)
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+        version_repository.bump(cur, "colleges", "programs", "students")
+        return row
 
 
 def delete(code):
@@ -42,7 +67,9 @@ def delete(code):
             'DELETE FROM colleges WHERE code = %s RETURNING code, name',
             (code,)
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+        version_repository.bump(cur, "colleges", "programs", "students")
+        return row
 
 
 def bulk_delete(codes):
@@ -52,4 +79,40 @@ def bulk_delete(codes):
             'DELETE FROM colleges WHERE code = ANY(%s) RETURNING code',
             (codes,)
         )
-        return cur.fetchall()
+        rows = cur.fetchall()
+        version_repository.bump(cur, "colleges", "programs", "students")
+        return rows
+
+
+
+UPDATABLE_FIELDS = ("name",)
+
+
+def bulk_update(rows, fields):
+    """Update many colleges with one statement. `rows` are (code, *values in `fields` order)."""
+    set_clause = ", ".join(f'{f} = v.{f}' for f in fields)
+    columns = ", ".join(("key",) + fields)
+    with get_db_cursor() as cur:
+        updated = execute_values(
+            cur,
+            f'UPDATE colleges AS t SET {set_clause} FROM (VALUES %s) AS v({columns}) '
+            'WHERE t.code = v.key RETURNING t.code',
+            rows, page_size=len(rows), fetch=True
+        )
+        if updated:
+            version_repository.bump(cur, "colleges")
+        return updated
+
+
+def bulk_upsert(rows):
+    """Insert or update many colleges with one statement. `rows` are (code, name)."""
+    with get_db_cursor() as cur:
+        written = execute_values(
+            cur,
+            'INSERT INTO colleges (code, name) VALUES %s '
+            'ON CONFLICT (code) DO UPDATE SET name = EXCLUDED.name '
+            'RETURNING code, (xmax = 0) AS inserted',
+            rows, page_size=len(rows), fetch=True
+        )
+        version_repository.bump(cur, "colleges")
+        return written
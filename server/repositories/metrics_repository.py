@@ -3,18 +3,62 @@ from services.database import get_db_cursor
 
 def get_table_count(table_name):
     """Get total count for a table."""
-    with get_db_cursor() as cur:
+    with get_db_cursor(readonly=True) as cur:
         cur.execute(f'SELECT COUNT(*) as count FROM {table_name}')
         return cur.fetchone()['count']
 
 
-def get_daily_counts(table_name, start_date, end_date):
-    """Get daily counts for a table within a date range."""
-    with get_db_cursor() as cur:
+def get_row_counts(table_names):
+    """Get trigger-maintained exact row counts for several tables in one lookup."""
+    with get_db_cursor(readonly=True) as cur:
         cur.execute(
-            f'SELECT DATE(created_at) as day, COUNT(*) as count FROM {table_name} '
-            'WHERE created_at >= %s AND created_at < %s '
-            'GROUP BY DATE(created_at)',
-            (start_date, end_date)
+            'SELECT table_name, row_count FROM table_row_counts WHERE table_name = ANY(%s)',
+            (list(table_names),)
+        )
+        return {row['table_name']: row['row_count'] for row in cur.fetchall()}
+
+
+def get_estimated_counts(table_names):
+    """Get planner row estimates (pg_class.reltuples) for several tables."""
+    with get_db_cursor(readonly=True) as cur:
+        cur.execute(
+            "SELECT relname AS table_name, GREATEST(reltuples, 0)::bigint AS row_count "
+            "FROM pg_class "
+            "WHERE relname = ANY(%s) AND relkind = 'r' AND relnamespace = 'public'::regnamespace",
+            (list(table_names),)
+        )
+        return {row['table_name']: row['row_count'] for row in cur.fetchall()}
+
+
+def get_bucketed_counts(table_names, bucket, start_date, end_date):
+    """
+    Get per-table created-row counts from the daily rollup, grouped into
+    day/week/month buckets, for all tables in a single query.
+    """
+    with get_db_cursor(readonly=True) as cur:
+        cur.execute(
+            'SELECT table_name, date_trunc(%s, day)::date AS bucket, SUM(created_count)::bigint AS count '
+            'FROM daily_row_counts '
+            'WHERE table_name = ANY(%s) AND day >= %s AND day < %s '
+            'GROUP BY table_name, bucket',
+            (bucket, list(table_names), start_date, end_date)
+        )
+        return cur.fetchall()
+
+
+def get_breakdown(dimensions):
+    """
+    Count students per value of each of `dimensions` (whitelisted column names)
+    plus the overall total, with a single GROUPING SETS query.
+    Rows carry the grouped columns, a GROUPING() bitmask and the count.
+    """
+    columns = ", ".join(dimensions)
+    grouping_sets = ", ".join(f"({d})" for d in dimensions)
+    with get_db_cursor(readonly=True) as cur:
+        cur.execute(
+            f'SELECT {columns}, GROUPING({columns}) AS grouping_mask, COUNT(*) AS count '
+            f'FROM students '
+            f'GROUP BY GROUPING SETS ((), {grouping_sets}) '
+            f'ORDER BY count DESC'
         )
         return cur.fetchall()
@@ -1,16 +1,35 @@
-from services.database import get_db_cursor
+from repositories import version_repository
+from psycopg2.extras import execute_values
+from services.database import get_db_cursor, stream_query
 
 
 def get_all():
     """Get all programs ordered by code."""
-    with get_db_cursor() as cur:
+    with get_db_cursor(readonly=True) as cur:
         cur.execute('SELECT code, name, college_code FROM programs ORDER BY code')
         return cur.fetchall()
 
 
+def iter_all(batch_size=1000):
+    """Stream all programs ordered by code from a server-side cursor."""
+    return stream_query('SELECT code, name, college_code FROM programs ORDER BY code', batch_size=batch_size)
+
+
+def get_counts():
+    """Get each program's student count, aggregated once over students."""
+    with get_db_cursor(readonly=True) as cur:
+        cur.execute('''
+            SELECT p.code, COALESCE(s.count, 0) AS student_count 
+            FROM programs p 
+            LEFT JOIN (SELECT course, COUNT(*) AS count FROM students GROUP BY course) s 
+                ON s.course = p.code
+        ''')
+        return cur.fetchall()
+
+
 def get_by_code(code):
     """Get a single program by code."""
-    with get_db_cursor() as cur:
+    with get_db_cursor(readonly=True) as cur:
         cur.execute('SELECT code, name, college_code FROM programs WHERE code = %s', (code,))
         return cur.fetchone()
 
@@ -22,17 +41,24 @@ def create(code, name, college_code):
             'INSERT INTO programs (code, name, college_code) VALUES (%s, %s, %s) RETURNING code, name, college_code',
             (code, name, college_code)
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+        version_repository.bump(cur, "programs")
+        return row
 
 
 def update(code, new_code, new_name, new_college_code):
-    """Update a program by code."""
+    """
+    Update a program by code. Its students' college_code is re-derived in the
+    same statement by the programs_sync_students_update trigger (migration 006).
+    """
     with get_db_cursor() as cur:
         cur.execute(
             'UPDATE programs SET code = %s, name = %s, college_code = %s WHERE code = %s RETURNING code, name, college_code',
             (new_code, new_name, new_college_code, code)
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+        version_repository.bump(cur, "programs", "students")
+        return row
 
 
 def delete(code):
@@ -42,7 +68,9 @@ def delete(code):
             'DELETE FROM programs WHERE code = %s RETURNING code, name, college_code',
             (code,)
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+        version_repository.bump(cur, "programs", "students")
+        return row
 
 
 def bulk_delete(codes):
@@ -52,4 +80,40 @@ def bulk_delete(codes):
             'DELETE FROM programs WHERE code = ANY(%s) RETURNING code',
             (codes,)
         )
-        return cur.fetchall()
+        rows = cur.fetchall()
+        version_repository.bump(cur, "programs", "students")
+        return rows
+
+
+
+UPDATABLE_FIELDS = ("name", "college_code")
+
+
+def bulk_update(rows, fields):
+    """Update many programs with one statement. `rows` are (code, *values in `fields` order)."""
+    set_clause = ", ".join(f'{f} = v.{f}' for f in fields)
+    columns = ", ".join(("key",) + fields)
+    with get_db_cursor() as cur:
+        updated = execute_values(
+            cur,
+            f'UPDATE programs AS t SET {set_clause} FROM (VALUES %s) AS v({columns}) '
+            'WHERE t.code = v.key RETURNING t.code',
+            rows, page_size=len(rows), fetch=True
+        )
+        if updated:
+            version_repository.bump(cur, "programs", "students")
+        return updated
+
+
+def bulk_upsert(rows):
+    """Insert or update many programs with one statement. `rows` are (code, name, college_code)."""
+    with get_db_cursor() as cur:
+        written = execute_values(
+            cur,
+            'INSERT INTO programs (code, name, college_code) VALUES %s '
+            'ON CONFLICT (code) DO UPDATE SET name = EXCLUDED.name, college_code = EXCLUDED.college_code '
+            'RETURNING code, (xmax = 0) AS inserted',
+            rows, page_size=len(rows), fetch=True
+        )
+        version_repository.bump(cur, "programs", "students")
+        return written
@@ -1,9 +1,38 @@
-from services.database import get_db_cursor
+from repositories import version_repository
+from psycopg2.extras import execute_values
+from services.database import get_db_cursor, stream_query, spool_rows, copy_rows, register_statement, execute_prepared
+
+
+# Hot single-row statements, prepared once per pooled connection
+_GET_BY_ID = register_statement("student_get_by_id", '''
+    SELECT "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path 
+    FROM students 
+    WHERE "idNo" = %s
+''')
+
+_CREATE = register_statement("student_create", '''
+    INSERT INTO students ("idNo", "firstName", "lastName", course, year, gender, photo_path, college_code) 
+    VALUES (%s, %s, %s, %s, %s, %s, %s, (SELECT college_code FROM programs WHERE code = %s)) 
+    RETURNING "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path
+''')
+
+_UPDATE = register_statement("student_update", '''
+    UPDATE students 
+    SET "idNo" = %s, "firstName" = %s, "lastName" = %s, course = %s, year = %s, gender = %s, photo_path = %s, 
+        college_code = (SELECT college_code FROM programs WHERE code = %s) 
+    WHERE "idNo" = %s 
+    RETURNING "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path
+''')
+
+_DELETE = register_statement("student_delete", '''
+    DELETE FROM students WHERE "idNo" = %s 
+    RETURNING "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path
+''')
 
 
 def get_all():
     """Get all students ordered by idNo."""
-    with get_db_cursor() as cur:
+    with get_db_cursor(readonly=True) as cur:
         cur.execute('''
             SELECT "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path 
             FROM students 
@@ -12,49 +41,106 @@ def get_all():
         return cur.fetchall()
 
 
+def get_all_columnar():
+    """Get all students as (column names, row tuples) without building per-row dicts."""
+    with get_db_cursor(cursor_factory=None, readonly=True) as cur:
+        cur.execute('''
+            SELECT "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path 
+            FROM students 
+            ORDER BY "idNo"
+        ''')
+        return [column.name for column in cur.description], cur.fetchall()
+
+
+def iter_all(batch_size=1000):
+    """Stream all students ordered by idNo from a server-side cursor."""
+    return stream_query('''
+        SELECT "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path 
+        FROM students 
+        ORDER BY "idNo"
+    ''', batch_size=batch_size)
+
+
 def get_by_id(id_no):
     """Get a single student by idNo."""
-    with get_db_cursor() as cur:
+    with get_db_cursor(readonly=True) as cur:
+        execute_prepared(cur, _GET_BY_ID, (id_no,))
+        return cur.fetchone()
+
+
+def get_by_ids(ids):
+    """Get the students with any of the given idNos in one query (in no particular order)."""
+    with get_db_cursor(readonly=True) as cur:
         cur.execute('''
             SELECT "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path 
             FROM students 
-            WHERE "idNo" = %s
-        ''', (id_no,))
-        return cur.fetchone()
+            WHERE "idNo" = ANY(%s)
+        ''', (ids,))
+        return cur.fetchall()
+
+
+def search(query, limit, match_names=True):
+    """
+    Search students by idNo prefix or by fuzzy/substring match on their full name.
+    ID prefix hits rank first, then rows by trigram similarity to the query.
+    Without `match_names` only the idNo prefix is matched, in idNo order.
+    """
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    with get_db_cursor(readonly=True) as cur:
+        if not match_names:
+            cur.execute('''
+                SELECT "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path 
+                FROM students 
+                WHERE "idNo" LIKE %s 
+                ORDER BY "idNo" 
+                LIMIT %s
+            ''', (escaped + '%', limit))
+            return cur.fetchall()
+
+        cur.execute('''
+            SELECT "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path 
+            FROM students 
+            WHERE "idNo" LIKE %(prefix)s 
+               OR ("firstName" || ' ' || "lastName") ILIKE %(pattern)s 
+               OR ("firstName" || ' ' || "lastName") %% %(query)s 
+            ORDER BY "idNo" LIKE %(prefix)s DESC, 
+                     similarity("firstName" || ' ' || "lastName", %(query)s) DESC, 
+                     "idNo" 
+            LIMIT %(limit)s
+        ''', {
+            "prefix": escaped + '%',
+            "pattern": '%' + escaped + '%',
+            "query": query,
+            "limit": limit,
+        })
+        return cur.fetchall()
 
 
 def create(id_no, first_name, last_name, course, year, gender, photo_path):
     """Create a new student."""
     with get_db_cursor() as cur:
-        cur.execute('''
-            INSERT INTO students ("idNo", "firstName", "lastName", course, year, gender, photo_path, college_code) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, (SELECT college_code FROM programs WHERE code = %s)) 
-            RETURNING "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path
-        ''', (id_no, first_name, last_name, course, year, gender, photo_path, course))
-        return cur.fetchone()
+        execute_prepared(cur, _CREATE, (id_no, first_name, last_name, course, year, gender, photo_path, course))
+        row = cur.fetchone()
+        version_repository.bump(cur, "students")
+        return row
 
 
 def update(id_no, new_id_no, first_name, last_name, course, year, gender, photo_path):
     """Update a student by idNo."""
     with get_db_cursor() as cur:
-        cur.execute('''
-            UPDATE students 
-            SET "idNo" = %s, "firstName" = %s, "lastName" = %s, course = %s, year = %s, gender = %s, photo_path = %s, 
-                college_code = (SELECT college_code FROM programs WHERE code = %s) 
-            WHERE "idNo" = %s 
-            RETURNING "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path
-        ''', (new_id_no, first_name, last_name, course, year, gender, photo_path, course, id_no))
-        return cur.fetchone()
+        execute_prepared(cur, _UPDATE, (new_id_no, first_name, last_name, course, year, gender, photo_path, course, id_no))
+        row = cur.fetchone()
+        version_repository.bump(cur, "students")
+        return row
 
 
 def delete(id_no):
     """Delete a student by idNo."""
     with get_db_cursor() as cur:
-        cur.execute('''
-            DELETE FROM students WHERE "idNo" = %s 
-            RETURNING "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path
-        ''', (id_no,))
-        return cur.fetchone()
+        execute_prepared(cur, _DELETE, (id_no,))
+        row = cur.fetchone()
+        version_repository.bump(cur, "students")
+        return row
 
 
 def bulk_delete(ids):
@@ -64,4 +150,206 @@ def bulk_delete(ids):
             'DELETE FROM students WHERE "idNo" = ANY(%s) RETURNING "idNo"',
             (ids,)
         )
+        rows = cur.fetchall()
+        version_repository.bump(cur, "students")
+        return rows
+
+
+# Whitelisted sort keys and filters mapped to their SQL column expressions
+SORT_COLUMNS = {
+    "idNo": '"idNo"',
+    "lastName": '"lastName"',
+    "course": "COALESCE(course, '')",
+    "year": 'COALESCE(year, 0)',
+}
+
+FILTER_COLUMNS = {
+    "course": 'course',
+    "college_code": 'college_code',
+    "year": 'year',
+    "gender": 'gender',
+}
+
+
+def get_page(limit, sort="idNo", descending=False, after=None, filters=None):
+    """
+    Get one keyset-paginated page of students.
+    `after` is the (sort value, idNo) pair of the last row of the previous page;
+    "idNo" breaks ties so the ordering is total and pages never overlap.
+    Fetches one extra row so the caller can tell whether another page exists.
+    Each row carries its `sort_key` so the next cursor can be built from it.
+    """
+    sort_column = SORT_COLUMNS[sort]
+    direction = "DESC" if descending else "ASC"
+    comparison = "<" if descending else ">"
+
+    conditions = []
+    params = []
+    for key, value in (filters or {}).items():
+        conditions.append(f'{FILTER_COLUMNS[key]} = %s')
+        params.append(value)
+
+    if after is not None:
+        if sort == "idNo":
+            conditions.append(f'"idNo" {comparison} %s')
+            params.append(after[1])
+        else:
+            conditions.append(f'({sort_column}, "idNo") {comparison} (%s, %s)')
+            params.extend(after)
+
+    where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+    order_by = f'"idNo" {direction}' if sort == "idNo" else f'{sort_column} {direction}, "idNo" {direction}'
+    params.append(limit + 1)
+
+    with get_db_cursor(readonly=True) as cur:
+        cur.execute(f'''
+            SELECT "idNo", "firstName", "lastName", "college_code", course, year, gender, photo_path, 
+                {sort_column} AS sort_key 
+            FROM students 
+            {where} 
+            ORDER BY {order_by} 
+            LIMIT %s
+        ''', params)
         return cur.fetchall()
+
+
+
+IMPORT_COLUMNS = ("line", "idNo", "firstName", "lastName", "course", "year", "gender", "photo_path")
+
+
+def import_rows(rows, upsert=False):
+    """
+    Bulk-load students in one transaction.
+    `rows` are tuples in IMPORT_COLUMNS order. They are spooled in full first
+    (they may still be reading the upload), then loaded into a temporary
+    staging table with COPY. Invalid rows are reported and skipped; the rest are
+    inserted (or upserted) with college_code resolved by a single join.
+    Returns (written rows with an `inserted` flag, error rows with `line`/`idNo`/`error`).
+    """
+    with spool_rows(rows) as buffer, get_db_cursor() as cur:
+        cur.execute('''
+            CREATE TEMP TABLE student_import (
+                line INTEGER, "idNo" TEXT, "firstName" TEXT, "lastName" TEXT,
+                course TEXT, year TEXT, gender TEXT, photo_path TEXT
+            ) ON COMMIT DROP
+        ''')
+        copy_rows(cur, "student_import", IMPORT_COLUMNS, buffer)
+
+        cur.execute('''
+            WITH checked AS (
+                SELECT s.line, s."idNo",
+                    CASE
+                        WHEN s."idNo" IS NULL THEN 'Missing idNo'
+                        WHEN s."firstName" IS NULL THEN 'Missing firstName'
+                        WHEN s."lastName" IS NULL THEN 'Missing lastName'
+                        WHEN s.year IS NOT NULL AND s.year !~ '^[0-9]{1,9}$' THEN 'Invalid year'
+                        WHEN s.course IS NOT NULL AND p.code IS NULL THEN 'Unknown course'
+                        WHEN s.line <> MIN(s.line) OVER (PARTITION BY s."idNo") THEN 'Duplicate idNo in upload'
+                        WHEN NOT %s AND EXISTS (SELECT 1 FROM students st WHERE st."idNo" = s."idNo")
+                            THEN 'Student already exists'
+                    END AS error
+                FROM student_import s
+                LEFT JOIN programs p ON p.code = s.course
+            ),
+            rejected AS (
+                DELETE FROM student_import s
+                USING checked c
+                WHERE s.line = c.line AND c.error IS NOT NULL
+                RETURNING c.line, c."idNo", c.error
+            )
+            SELECT line, "idNo", error FROM rejected ORDER BY line
+        ''', (upsert,))
+        errors = cur.fetchall()
+
+        cur.execute('''
+            INSERT INTO students ("idNo", "firstName", "lastName", course, year, gender, photo_path, college_code) 
+            SELECT s."idNo", s."firstName", s."lastName", s.course, s.year::int, s.gender, s.photo_path, p.college_code 
+            FROM student_import s 
+            LEFT JOIN programs p ON p.code = s.course 
+            ON CONFLICT ("idNo") DO UPDATE 
+            SET "firstName" = EXCLUDED."firstName", "lastName" = EXCLUDED."lastName", 
+                course = EXCLUDED.course, year = EXCLUDED.year, gender = EXCLUDED.gender, 
+                photo_path = EXCLUDED.photo_path, college_code = EXCLUDED.college_code 
+            RETURNING "idNo", (xmax = 0) AS inserted
+        ''')
+        written = cur.fetchall()
+        if written:
+            version_repository.bump(cur, "students")
+        return written, errors
+
+
+
+UPDATABLE_FIELDS = ("firstName", "lastName", "course", "year", "gender", "photo_path")
+
+# VALUES lists infer types from their first row, so non-text columns need casts
+_FIELD_CASTS = {"year": "int"}
+
+
+def bulk_update(rows, fields):
+    """
+    Update many students with one statement. `rows` are (idNo, *values in `fields` order).
+    college_code is re-derived with a join whenever course is among the fields.
+    """
+    set_clause = ", ".join(f'"{f}" = v."{f}"' for f in fields)
+    columns = ", ".join(['"key"'] + [f'"{f}"' for f in fields])
+    template = "(" + ", ".join(["%s"] + [f"%s::{_FIELD_CASTS.get(f, 'text')}" for f in fields]) + ")"
+    join = ''
+    if "course" in fields:
+        set_clause += ', college_code = p.college_code'
+        join = 'LEFT JOIN programs p ON p.code = v.course'
+
+    with get_db_cursor() as cur:
+        updated = execute_values(cur, f'''
+            UPDATE students AS t 
+            SET {set_clause} 
+            FROM (VALUES %s) AS v({columns}) {join} 
+            WHERE t."idNo" = v."key" 
+            RETURNING t."idNo"
+        ''', rows, template=template, page_size=len(rows), fetch=True)
+        if updated:
+            version_repository.bump(cur, "students")
+        return updated
+
+
+def bulk_upsert(rows):
+    """
+    Insert or update many students with one statement, resolving college_code
+    with a single join. `rows` are (idNo, firstName, lastName, course, year, gender, photo_path).
+    """
+    with get_db_cursor() as cur:
+        written = execute_values(cur, '''
+            INSERT INTO students ("idNo", "firstName", "lastName", course, year, gender, photo_path, college_code) 
+            SELECT v."idNo", v."firstName", v."lastName", v.course, v.year, v.gender, v.photo_path, p.college_code 
+            FROM (VALUES %s) AS v("idNo", "firstName", "lastName", course, year, gender, photo_path) 
+            LEFT JOIN programs p ON p.code = v.course 
+            ON CONFLICT ("idNo") DO UPDATE 
+            SET "firstName" = EXCLUDED."firstName", "lastName" = EXCLUDED."lastName", 
+                course = EXCLUDED.course, year = EXCLUDED.year, gender = EXCLUDED.gender, 
+                photo_path = EXCLUDED.photo_path, college_code = EXCLUDED.college_code 
+            RETURNING "idNo", (xmax = 0) AS inserted
+        ''', rows, template="(%s, %s, %s, %s, %s::int, %s, %s)", page_size=len(rows), fetch=True)
+        version_repository.bump(cur, "students")
+        return written
+
+
+def resync_college_codes():
+    """
+    Re-derive college_code from each student's program in one statement,
+    repairing any drift. Only rows whose value actually changes are written.
+    Returns the number of students repaired.
+    """
+    with get_db_cursor() as cur:
+        cur.execute('''
+            UPDATE students AS s 
+            SET college_code = d.college_code 
+            FROM (
+                SELECT st."idNo", p.college_code 
+                FROM students st 
+                LEFT JOIN programs p ON p.code = st.course
+            ) AS d 
+            WHERE d."idNo" = s."idNo" AND s.college_code IS DISTINCT FROM d.college_code
+        ''')
+        updated = cur.rowcount
+        if updated:
+            version_repository.bump(cur, "students")
+        return updated
@@ -0,0 +1,24 @@
+from services.database import get_db_cursor, register_statement, execute_prepared
+
+_BUMP = register_statement(
+    "table_versions_bump",
+    'UPDATE table_versions SET version = version + 1 WHERE table_name = ANY(%s)'
+)
+
+
+def get_versions(table_names):
+    """Get the current version counter for each of the given tables."""
+    with get_db_cursor(readonly=True) as cur:
+        cur.execute(
+            'SELECT table_name, version FROM table_versions WHERE table_name = ANY(%s)',
+            (list(table_names),)
+        )
+        return {row['table_name']: row['version'] for row in cur.fetchall()}
+
+
+def bump(cur, *table_names):
+    """
+    Increment the version counter of the given tables.
+    Runs on the caller's cursor so it commits or rolls back with the write itself.
+    """
+    execute_prepared(cur, _BUMP, (list(table_names),))
@@ -0,0 +1,21 @@
+from flask import Blueprint, request, jsonify
+from services.auth import require_auth
+from services.batch import body_field
+from services.business import batch_service
+
+batch_bp = Blueprint("batch", __name__, url_prefix="/api/batch")
+
+
+# POST run several create/update/delete operations in one transaction
+@batch_bp.route("", methods=["POST"])
+@require_auth
+def run_batch():
+    try:
+        result = batch_service.run(body_field(request.get_json(), "operations"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to run batch: {str(e)}"
+        print(f"Database BATCH error: {e}")
+        return jsonify({"error": error_msg}), 500
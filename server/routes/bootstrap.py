@@ -0,0 +1,21 @@
+from flask import Blueprint, request, jsonify
+from services.business import bootstrap_service
+
+bootstrap_bp = Blueprint("bootstrap", __name__, url_prefix="/api/bootstrap")
+
+
+# GET the dashboard's initial data in one response
+@bootstrap_bp.route("", methods=["GET"])
+def get_bootstrap():
+    try:
+        data = bootstrap_service.get_bootstrap(
+            days=request.args.get("days", 7, type=int),
+            limit=request.args.get("limit", type=int),
+        )
+        return jsonify(data), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to fetch bootstrap data: {str(e)}"
+        print(f"Database GET bootstrap error: {e}")
+        return jsonify({"error": error_msg}), 500
@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
 from services.auth import require_auth
+from services.batch import body_field
+from services.streaming import wants_stream, wants_columnar, stream_response
+from services.http_cache import conditional
 from services.business import college_service
 
 colleges_bp = Blueprint("colleges", __name__, url_prefix="/api/colleges")
@@ -7,9 +10,16 @@ colleges_bp = Blueprint("colleges", __name__, url_prefix="/api/colleges")
 
 # GET all colleges
 @colleges_bp.route("/", methods=["GET"])
+@conditional("colleges", include_tables={"counts": ("programs", "students")})
 def get_colleges():
     try:
-        colleges = college_service.get_all()
+        if wants_stream():
+            return stream_response(college_service.iter_all())
+
+        if wants_columnar():
+            return jsonify(college_service.get_all_columnar()), 200
+
+        colleges = college_service.get_all(include_counts=request.args.get("include") == "counts")
         return jsonify(colleges), 200
     except Exception as e:
         error_msg = f"Failed to fetch colleges: {str(e)}"
@@ -17,6 +27,20 @@ def get_colleges():
         return jsonify({"error": error_msg}), 500
 
 
+# POST look up many colleges by code in one request
+@colleges_bp.route("/lookup", methods=["POST"])
+def lookup_colleges():
+    try:
+        result = college_service.lookup(body_field(request.get_json(), "codes"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to look up colleges: {str(e)}"
+        print(f"Database LOOKUP colleges error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
 # POST create a new college
 @colleges_bp.route("/", methods=["POST"])
 @require_auth
@@ -83,3 +107,33 @@ def bulk_delete_colleges():
         error_msg = f"Failed to bulk delete colleges: {str(e)}"
         print(f"Database BULK DELETE colleges error: {e}")
         return jsonify({"error": error_msg}), 500
+
+
+# BATCH UPDATE colleges
+@colleges_bp.route("/bulk-update", methods=["POST"])
+@require_auth
+def bulk_update_colleges():
+    try:
+        result = college_service.bulk_update(body_field(request.get_json(), "records"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to bulk update colleges: {str(e)}"
+        print(f"Database BULK UPDATE colleges error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
+# BATCH UPSERT colleges
+@colleges_bp.route("/bulk-upsert", methods=["POST"])
+@require_auth
+def bulk_upsert_colleges():
+    try:
+        result = college_service.bulk_upsert(body_field(request.get_json(), "records"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to bulk upsert colleges: {str(e)}"
+        print(f"Database BULK UPSERT colleges error: {e}")
+        return jsonify({"error": error_msg}), 500
@@ -1,5 +1,11 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, request
 from services.business import metrics_service
+from services.cache import get_cache_stats
+from services.http_cache import conditional
+from services.database import get_pool_stats
+from services.instrumentation import render_prometheus
+from services.auth import require_auth
+from services import slow_query_log
 
 metrics_bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
 
@@ -8,7 +14,8 @@ metrics_bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
 def get_counts():
     """Return total counts for all tables - lightweight endpoint."""
     try:
-        counts = metrics_service.get_all_counts()
+        approximate = request.args.get("approximate") in ("1", "true")
+        counts = metrics_service.get_all_counts(approximate=approximate)
         return jsonify(counts), 200
     except Exception as e:
         print("Database GET counts error:", e)
@@ -23,10 +30,57 @@ def get_counts():
 
 @metrics_bp.route("/daily", methods=["GET"])
 def daily_metrics():
-    """Return last 7 days of counts for colleges, programs, students, users."""
+    """Return counts for colleges, programs, students, users over ?days= (default 7), per ?bucket=day|week|month."""
     try:
-        metrics = metrics_service.get_daily_metrics(days=7)
+        metrics = metrics_service.get_daily_metrics(
+            days=request.args.get("days", 7, type=int),
+            bucket=request.args.get("bucket", "day"),
+        )
         return jsonify(metrics), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print("Database daily metrics error:", e)
         return jsonify([]), 200
+
+
+@metrics_bp.route("/breakdown", methods=["GET"])
+@conditional("students", "programs")
+def breakdown():
+    """Return student counts per ?by=college_code,course,year,gender (all by default) and the total."""
+    try:
+        result = metrics_service.get_breakdown(request.args.get("by"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Database breakdown metrics error:", e)
+        return jsonify({"error": f"Failed to fetch breakdown: {str(e)}"}), 500
+
+
+@metrics_bp.route("/cache", methods=["GET"])
+def cache_stats():
+    """Return hit/miss/eviction counters for the in-process caches."""
+    return jsonify(get_cache_stats()), 200
+
+
+@metrics_bp.route("/pool", methods=["GET"])
+def pool_stats():
+    """Return database connection pool usage (in use, idle, waiters, wait time)."""
+    return jsonify(get_pool_stats() or {}), 200
+
+
+@metrics_bp.route("/prometheus", methods=["GET"])
+def prometheus_metrics():
+    """Return per-endpoint latency histograms, status counts and DB/pool timing for Prometheus."""
+    return Response(
+        render_prometheus(get_pool_stats()),
+        mimetype="text/plain; version=0.0.4"
+    )
+
+
+@metrics_bp.route("/slow-queries", methods=["GET"])
+@require_auth
+def slow_queries():
+    """Return recent slow queries (newest first) with sampled EXPLAIN plans."""
+    return jsonify(slow_query_log.get_entries()), 200
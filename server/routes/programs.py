@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
 from services.auth import require_auth
+from services.batch import body_field
+from services.streaming import wants_stream, wants_columnar, stream_response
+from services.http_cache import conditional
 from services.business import program_service
 
 programs_bp = Blueprint("programs", __name__, url_prefix="/api/programs")
@@ -7,9 +10,16 @@ programs_bp = Blueprint("programs", __name__, url_prefix="/api/programs")
 
 # GET all programs
 @programs_bp.route("/", methods=["GET"])
+@conditional("programs", include_tables={"counts": ("students",)})
 def get_programs():
     try:
-        programs = program_service.get_all()
+        if wants_stream():
+            return stream_response(program_service.iter_all())
+
+        if wants_columnar():
+            return jsonify(program_service.get_all_columnar()), 200
+
+        programs = program_service.get_all(include_counts=request.args.get("include") == "counts")
         return jsonify(programs), 200
     except Exception as e:
         error_msg = f"Failed to fetch programs: {str(e)}"
@@ -17,6 +27,20 @@ def get_programs():
         return jsonify({"error": error_msg}), 500
 
 
+# POST look up many programs by code in one request
+@programs_bp.route("/lookup", methods=["POST"])
+def lookup_programs():
+    try:
+        result = program_service.lookup(body_field(request.get_json(), "codes"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to look up programs: {str(e)}"
+        print(f"Database LOOKUP programs error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
 # POST create a new program
 @programs_bp.route("/", methods=["POST"])
 @require_auth
@@ -85,3 +109,33 @@ def bulk_delete_programs():
         error_msg = f"Failed to bulk delete programs: {str(e)}"
         print(f"Database BULK DELETE programs error: {e}")
         return jsonify({"error": error_msg}), 500
+
+
+# BATCH UPDATE programs
+@programs_bp.route("/bulk-update", methods=["POST"])
+@require_auth
+def bulk_update_programs():
+    try:
+        result = program_service.bulk_update(body_field(request.get_json(), "records"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to bulk update programs: {str(e)}"
+        print(f"Database BULK UPDATE programs error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
+# BATCH UPSERT programs
+@programs_bp.route("/bulk-upsert", methods=["POST"])
+@require_auth
+def bulk_upsert_programs():
+    try:
+        result = program_service.bulk_upsert(body_field(request.get_json(), "records"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to bulk upsert programs: {str(e)}"
+        print(f"Database BULK UPSERT programs error: {e}")
+        return jsonify({"error": error_msg}), 500
@@ -1,22 +1,83 @@
 from flask import Blueprint, request, jsonify
 from services.auth import require_auth
+from services.batch import body_field
+from services.streaming import wants_stream, wants_columnar, stream_response
+from services.http_cache import conditional
 from services.business import student_service
 
 students_bp = Blueprint("students", __name__, url_prefix="/api/students")
 
+# Any of these query params switches the listing to keyset pagination
+PAGINATION_PARAMS = ("limit", "after", "sort", "order", "course", "college_code", "year", "gender")
 
-# GET all students
+
+# GET all students (or one page when pagination/filter params are given)
 @students_bp.route("/", methods=["GET"])
+@conditional("students")
 def get_students():
     try:
+        if any(param in request.args for param in PAGINATION_PARAMS):
+            page = student_service.get_page(
+                limit=request.args.get("limit", type=int),
+                after=request.args.get("after"),
+                sort=request.args.get("sort", "idNo"),
+                order=request.args.get("order", "asc"),
+                filters={
+                    "course": request.args.get("course"),
+                    "college_code": request.args.get("college_code"),
+                    "year": request.args.get("year"),
+                    "gender": request.args.get("gender"),
+                },
+            )
+            return jsonify(page), 200
+
+        if wants_stream():
+            return stream_response(student_service.iter_all())
+
+        if wants_columnar():
+            return jsonify(student_service.get_all_columnar()), 200
+
         students = student_service.get_all()
         return jsonify(students), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         error_msg = f"Failed to fetch students: {str(e)}"
         print(f"Database GET students error: {e}")
         return jsonify({"error": error_msg}), 500
 
 
+# GET search students by ID prefix or name
+@students_bp.route("/search", methods=["GET"])
+def search_students():
+    try:
+        students = student_service.search(
+            request.args.get("q"),
+            limit=request.args.get("limit", type=int),
+        )
+        return jsonify(students), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to search students: {str(e)}"
+        print(f"Database SEARCH students error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
+# POST look up many students by ID in one request
+@students_bp.route("/lookup", methods=["POST"])
+def lookup_students():
+    try:
+        result = student_service.lookup(body_field(request.get_json(), "ids"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to look up students: {str(e)}"
+        print(f"Database LOOKUP students error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
 # POST create a new student
 @students_bp.route("/", methods=["POST"])
 @require_auth
@@ -39,6 +100,32 @@ def create_student():
         return jsonify({"error": error_msg}), 500
 
 
+# POST bulk import students from a CSV or NDJSON upload
+@students_bp.route("/import", methods=["POST"])
+@require_auth
+def import_students():
+    try:
+        upload = request.files.get("file")
+        if upload:
+            stream, content_type, filename = upload.stream, upload.mimetype, upload.filename or ""
+        else:
+            stream, content_type, filename = request.stream, request.mimetype, ""
+
+        is_ndjson = "ndjson" in content_type or filename.endswith((".ndjson", ".jsonl"))
+        result = student_service.import_students(
+            stream,
+            fmt=request.args.get("format", "ndjson" if is_ndjson else "csv"),
+            upsert=request.args.get("mode") == "upsert",
+        )
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to import students: {str(e)}"
+        print(f"Database IMPORT students error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
 # PUT update a student by idNo
 @students_bp.route("/<string:id_no>", methods=["PUT"])
 @require_auth
@@ -100,3 +187,46 @@ def bulk_delete_students():
         error_msg = f"Failed to bulk delete students: {str(e)}"
         print(f"Database BULK DELETE students error: {e}")
         return jsonify({"error": error_msg}), 500
+
+
+# BATCH UPDATE students
+@students_bp.route("/bulk-update", methods=["POST"])
+@require_auth
+def bulk_update_students():
+    try:
+        result = student_service.bulk_update(body_field(request.get_json(), "records"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to bulk update students: {str(e)}"
+        print(f"Database BULK UPDATE students error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
+# BATCH UPSERT students
+@students_bp.route("/bulk-upsert", methods=["POST"])
+@require_auth
+def bulk_upsert_students():
+    try:
+        result = student_service.bulk_upsert(body_field(request.get_json(), "records"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_msg = f"Failed to bulk upsert students: {str(e)}"
+        print(f"Database BULK UPSERT students error: {e}")
+        return jsonify({"error": error_msg}), 500
+
+
+# POST re-derive every student's college_code from their program
+@students_bp.route("/resync-college-codes", methods=["POST"])
+@require_auth
+def resync_student_college_codes():
+    try:
+        result = student_service.resync_college_codes()
+        return jsonify(result), 200
+    except Exception as e:
+        error_msg = f"Failed to resync student college codes: {str(e)}"
+        print(f"Database RESYNC students error: {e}")
+        return jsonify({"error": error_msg}), 500
@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify
+from services.http_cache import conditional
 from services.business import user_service
 
 users_bp = Blueprint("users", __name__, url_prefix="/api/users")
@@ -6,6 +7,7 @@ users_bp = Blueprint("users", __name__, url_prefix="/api/users")
 
 # GET all users
 @users_bp.route("/", methods=["GET"])
+@conditional("users")
 def list_users():
     try:
         users = user_service.get_all()
@@ -0,0 +1,79 @@
+"""
+Benchmark serializing and compressing the full student list (100k rows by
+default): the stdlib `jsonify` path vs the orjson provider, and gzip/brotli.
+No database needed; rows are synthetic but shaped like `_format_student`.
+
+Usage (from the server/ directory):
+    python -m scripts.bench_json [rows]
+"""
+import gzip
+import random
+import sys
+import time
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from services import compression
+from services.json_provider import FastJSONProvider, orjson
+
+
+def _rows(count):
+    rng = random.Random(42)
+    return [
+        {
+            "idNo": f"2025-{i:06d}",
+            "firstName": rng.choice(["John", "Jane", "Alex", "Chris", "Pat"]),
+            "lastName": rng.choice(["Smith", "Johnson", "Garcia", "Lee", "Martinez"]),
+            "college_code": rng.choice(["CCS", "COE", "CSM", "CED"]),
+            "course": rng.choice(["BSCS", "BSIT", "BSIS", "BSECE", "BSMATH"]),
+            "year": rng.randint(1, 4),
+            "gender": rng.choice(["Male", "Female"]),
+            "photo_path": "",
+        }
+        for i in range(count)
+    ]
+
+
+def _best_of(runs, fn):
+    """Return (best seconds, last result) over `runs` calls."""
+    best, result = float("inf"), None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = _rows(count)
+    app = Flask(__name__)
+
+    results = []
+    for name, provider in (("stdlib jsonify", DefaultJSONProvider(app)), ("orjson provider", FastJSONProvider(app))):
+        if name.startswith("orjson") and orjson is None:
+            print("orjson not installed; skipping the fast provider")
+            continue
+        app.json = provider
+        with app.app_context():
+            seconds, response = _best_of(5, lambda: app.json.response(rows))
+        results.append((name, seconds, response.get_data()))
+
+    body = results[0][2]
+    print(f"{count} students, {len(body) / 1e6:.2f} MB uncompressed\n")
+    for name, seconds, data in results:
+        print(f"{name:18} {seconds * 1000:8.1f} ms  {len(data) / 1e6:6.2f} MB")
+
+    print()
+    gz_seconds, gz_body = _best_of(3, lambda: gzip.compress(body, compresslevel=compression.GZIP_LEVEL))
+    print(f"{'gzip -' + str(compression.GZIP_LEVEL):18} {gz_seconds * 1000:8.1f} ms  {len(gz_body) / 1e6:6.2f} MB")
+    if compression.brotli is not None:
+        br_seconds, br_body = _best_of(
+            3, lambda: compression.brotli.compress(body, quality=compression.BR_QUALITY)
+        )
+        print(f"{'brotli q' + str(compression.BR_QUALITY):18} {br_seconds * 1000:8.1f} ms  {len(br_body) / 1e6:6.2f} MB")
+    else:
+        print("brotli not installed; skipping")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: plain execute vs the prepared-statement registry for the
+student get_by_id and create statements. Creates are rolled back, so the
+database is left unchanged.
+
+Usage (from the server/ directory, with DATABASE_URL set):
+    python -m scripts.bench_prepared [iterations]
+"""
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import psycopg2  # noqa: E402
+from services import database  # noqa: E402
+from services.database import TrackedConnection, execute_prepared, _statements  # noqa: E402
+from repositories import student_repository  # noqa: E402
+
+
+def _time_calls(conn, iterations, run):
+    """Return mean microseconds per call of run(cur, i)."""
+    with conn.cursor() as cur:
+        started = time.perf_counter()
+        for i in range(iterations):
+            run(cur, i)
+        elapsed = time.perf_counter() - started
+    return elapsed / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    # Measure the prepared path regardless of DB_PREPARED_STATEMENTS
+    database._prepared_statements_enabled = True
+    conn = psycopg2.connect(os.environ["DATABASE_URL"], connection_factory=TrackedConnection)
+    conn.autocommit = True
+
+    with conn.cursor() as cur:
+        cur.execute('SELECT "idNo" FROM students LIMIT 1')
+        row = cur.fetchone()
+        cur.execute('SELECT code FROM programs LIMIT 1')
+        program = cur.fetchone()
+    if not row or not program:
+        sys.exit("Need at least one student and one program to benchmark against")
+    id_no, course = row[0], program[0]
+
+    get_by_id_sql = _statements[student_repository._GET_BY_ID][0]
+    create_sql = _statements[student_repository._CREATE][0]
+
+    def create_params(i):
+        return (f"bench-{i}", "Bench", "Mark", course, 1, "Male", "", course)
+
+    def rolled_back(execute):
+        def run(cur, i):
+            cur.execute("BEGIN")
+            execute(cur, i)
+            cur.execute("ROLLBACK")
+        return run
+
+    results = {
+        "get_by_id": {
+            "plain_us": _time_calls(conn, iterations, lambda cur, i: cur.execute(get_by_id_sql, (id_no,))),
+            "prepared_us": _time_calls(
+                conn, iterations, lambda cur, i: execute_prepared(cur, student_repository._GET_BY_ID, (id_no,))
+            ),
+        },
+        "create": {
+            "plain_us": _time_calls(
+                conn, iterations, rolled_back(lambda cur, i: cur.execute(create_sql, create_params(i)))
+            ),
+            "prepared_us": _time_calls(
+                conn, iterations,
+                rolled_back(lambda cur, i: execute_prepared(cur, student_repository._CREATE, create_params(i)))
+            ),
+        },
+    }
+
+    for name, timings in results.items():
+        saving = timings["plain_us"] - timings["prepared_us"]
+        print(
+            f"{name:10} plain {timings['plain_us']:8.1f} us/call   "
+            f"prepared {timings['prepared_us']:8.1f} us/call   "
+            f"saving {saving:7.1f} us ({saving / timings['plain_us']:.0%})"
+        )
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Apply the SQL files in scripts/migrations/ in filename order.
+Applied files are recorded in schema_migrations so each runs only once.
+
+Usage (from the server/ directory):
+    python -m scripts.migrate
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services.database import get_db_cursor, close_pool  # noqa: E402
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+
+def main():
+    with get_db_cursor() as cur:
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                filename TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        ''')
+        cur.execute('SELECT filename FROM schema_migrations')
+        applied = {row["filename"] for row in cur.fetchall()}
+
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not filename.endswith(".sql") or filename in applied:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, filename), encoding="utf-8") as f:
+            sql = f.read()
+        # Each migration runs in its own transaction
+        with get_db_cursor() as cur:
+            cur.execute(sql)
+            cur.execute('INSERT INTO schema_migrations (filename) VALUES (%s)', (filename,))
+        print(f"Applied {filename}")
+
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+-- Indexes backing keyset pagination and filtering on GET /api/students/
+-- Sort expressions must match student_repository.SORT_COLUMNS exactly.
+
+CREATE INDEX IF NOT EXISTS students_last_name_id_idx
+    ON public.students ("lastName", "idNo");
+
+CREATE INDEX IF NOT EXISTS students_course_id_idx
+    ON public.students ((COALESCE(course, '')), "idNo");
+
+CREATE INDEX IF NOT EXISTS students_year_id_idx
+    ON public.students ((COALESCE(year, 0)), "idNo");
+
+CREATE INDEX IF NOT EXISTS students_college_code_idx
+    ON public.students (college_code);
+
+CREATE INDEX IF NOT EXISTS students_gender_idx
+    ON public.students (gender);
@@ -0,0 +1,10 @@
+-- Indexes backing GET /api/students/search
+-- Name expression must match student_repository.search exactly.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS students_id_prefix_idx
+    ON public.students ("idNo" text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS students_full_name_trgm_idx
+    ON public.students USING gin (("firstName" || ' ' || "lastName") gin_trgm_ops);
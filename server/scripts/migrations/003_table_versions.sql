@@ -0,0 +1,24 @@
+-- Per-table version counters backing ETags on list endpoints.
+-- Repository write paths bump these in the same transaction as the write;
+-- users are written by Supabase Auth, so that table is bumped by a trigger.
+
+CREATE TABLE IF NOT EXISTS public.table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO public.table_versions (table_name)
+VALUES ('colleges'), ('programs'), ('students'), ('users')
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION public.bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS users_bump_version ON public.users;
+CREATE TRIGGER users_bump_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.users
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
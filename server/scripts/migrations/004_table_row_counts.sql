@@ -0,0 +1,74 @@
+-- Exact row counters backing GET /api/metrics/counts.
+-- Statement-level triggers apply each statement's net row delta, so bulk
+-- inserts/deletes cost one counter update instead of one per row.
+
+CREATE TABLE IF NOT EXISTS public.table_row_counts (
+    table_name TEXT PRIMARY KEY,
+    row_count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION public.count_inserted_rows() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.table_row_counts
+    SET row_count = row_count + (SELECT COUNT(*) FROM new_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.count_deleted_rows() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.table_row_counts
+    SET row_count = row_count - (SELECT COUNT(*) FROM old_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.count_truncated_rows() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.table_row_counts SET row_count = 0 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['colleges', 'programs', 'students', 'users'] LOOP
+        -- Lock out writers while the starting count is taken
+        EXECUTE format('LOCK TABLE public.%I IN SHARE MODE', t);
+
+        EXECUTE format(
+            'INSERT INTO public.table_row_counts (table_name, row_count) '
+            'SELECT %L, COUNT(*) FROM public.%I '
+            'ON CONFLICT (table_name) DO UPDATE SET row_count = EXCLUDED.row_count',
+            t, t
+        );
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_count_insert', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON public.%I '
+            'REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.count_inserted_rows()',
+            t || '_count_insert', t
+        );
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_count_delete', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON public.%I '
+            'REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.count_deleted_rows()',
+            t || '_count_delete', t
+        );
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_count_truncate', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER TRUNCATE ON public.%I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.count_truncated_rows()',
+            t || '_count_truncate', t
+        );
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,79 @@
+-- Daily rollup of rows created per table, backing GET /api/metrics/daily.
+-- Statement-level triggers add/subtract each statement's rows per day, so the
+-- metrics query reads at most one row per table per day in the window.
+
+CREATE TABLE IF NOT EXISTS public.daily_row_counts (
+    table_name TEXT NOT NULL,
+    day DATE NOT NULL,
+    created_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, table_name)
+);
+
+CREATE OR REPLACE FUNCTION public.rollup_inserted_rows() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO public.daily_row_counts AS d (table_name, day, created_count)
+    SELECT TG_TABLE_NAME, DATE(created_at), COUNT(*) FROM new_rows
+    WHERE created_at IS NOT NULL GROUP BY DATE(created_at)
+    ON CONFLICT (day, table_name) DO UPDATE SET created_count = d.created_count + EXCLUDED.created_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.rollup_deleted_rows() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.daily_row_counts AS d
+    SET created_count = d.created_count - o.count
+    FROM (SELECT DATE(created_at) AS day, COUNT(*) AS count FROM old_rows
+          WHERE created_at IS NOT NULL GROUP BY DATE(created_at)) AS o
+    WHERE d.table_name = TG_TABLE_NAME AND d.day = o.day;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.rollup_truncated_rows() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM public.daily_row_counts WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['colleges', 'programs', 'students', 'users'] LOOP
+        EXECUTE format('LOCK TABLE public.%I IN SHARE MODE', t);
+
+        EXECUTE format('DELETE FROM public.daily_row_counts WHERE table_name = %L', t);
+        EXECUTE format(
+            'INSERT INTO public.daily_row_counts (table_name, day, created_count) '
+            'SELECT %L, DATE(created_at), COUNT(*) FROM public.%I '
+            'WHERE created_at IS NOT NULL GROUP BY DATE(created_at)',
+            t, t
+        );
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_rollup_insert', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON public.%I '
+            'REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_inserted_rows()',
+            t || '_rollup_insert', t
+        );
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_rollup_delete', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON public.%I '
+            'REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_deleted_rows()',
+            t || '_rollup_delete', t
+        );
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_rollup_truncate', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER TRUNCATE ON public.%I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_truncated_rows()',
+            t || '_rollup_truncate', t
+        );
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,40 @@
+-- Keep the denormalized students.college_code in step with programs.
+-- Statement-level triggers re-derive every affected student in one UPDATE, so
+-- renaming a program, moving it to another college (including the cascade from
+-- a college code change) or deleting it touches students once per statement.
+-- POST /api/students/resync-college-codes repairs any drift left from before.
+
+CREATE INDEX IF NOT EXISTS students_course_idx
+    ON public.students (course);
+
+CREATE OR REPLACE FUNCTION public.sync_updated_program_students() RETURNS trigger AS $$
+BEGIN
+    -- ON UPDATE CASCADE has already rewritten students.course to the new codes
+    UPDATE public.students AS s
+    SET college_code = n.college_code
+    FROM new_rows AS n
+    WHERE s.course = n.code AND s.college_code IS DISTINCT FROM n.college_code;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.sync_deleted_program_students() RETURNS trigger AS $$
+BEGIN
+    -- ON DELETE SET NULL has already cleared students.course
+    UPDATE public.students AS s
+    SET college_code = NULL
+    WHERE s.course IS NULL
+      AND s.college_code IN (SELECT college_code FROM old_rows WHERE college_code IS NOT NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS programs_sync_students_update ON public.programs;
+CREATE TRIGGER programs_sync_students_update AFTER UPDATE ON public.programs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.sync_updated_program_students();
+
+DROP TRIGGER IF EXISTS programs_sync_students_delete ON public.programs;
+CREATE TRIGGER programs_sync_students_delete AFTER DELETE ON public.programs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.sync_deleted_program_students();
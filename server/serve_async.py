@@ -0,0 +1,72 @@
+"""
+Event-loop serving mode for the API.
+
+Runs the same Flask app (same blueprints, services and repositories) on a
+gevent event loop instead of a thread per request. Sockets, locks and the
+connection pool's wait queue become cooperative, and psycopg2 is switched to
+its non-blocking protocol through a wait callback, so a query yields to other
+requests while it waits on PostgreSQL. Thousands of mostly idle clients cost a
+greenlet each rather than an OS thread; DB concurrency is still bounded by
+DB_POOL_MAX. COPY can't run cooperatively, so bulk imports load their staging
+rows with multi-row INSERTs here, which is slower than under the threaded server.
+
+Requires gevent (listed in the Pipfile; `pipenv install`).
+
+Usage (from the server/ directory):
+    python serve_async.py
+
+Environment:
+    HOST         bind address (default 127.0.0.1)
+    PORT         bind port (default 5000)
+    MAX_CLIENTS  concurrent client connections (default 10000)
+"""
+try:
+    from gevent import monkey
+except ImportError:
+    raise SystemExit("serve_async.py requires gevent: pipenv install gevent")
+
+# Must run before anything imports threading, socket or ssl
+monkey.patch_all()
+
+import os  # noqa: E402
+import psycopg2  # noqa: E402
+from psycopg2 import extensions  # noqa: E402
+from gevent.pool import Pool  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+from gevent.socket import wait_read, wait_write  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+
+
+def gevent_wait_callback(conn, timeout=None):
+    """Let psycopg2 wait on the socket through the gevent hub instead of blocking."""
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state}")
+
+
+def main():
+    load_dotenv()
+
+    from services.database import set_wait_callback
+    set_wait_callback(gevent_wait_callback)
+
+    from app import app
+
+    host = os.environ.get("HOST", "127.0.0.1")
+    port = int(os.environ.get("PORT", 5000))
+    max_clients = int(os.environ.get("MAX_CLIENTS", 10000))
+
+    server = WSGIServer((host, port), app, spawn=Pool(max_clients))
+    print(f"Serving on http://{host}:{port} (gevent, up to {max_clients} clients)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
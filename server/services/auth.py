@@ -1,55 +1,124 @@
 from flask import request, g, jsonify
 from functools import wraps
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+import time
 import jwt
 import json
 
+# Supabase signs access tokens either with the project's shared JWT secret (HS256)
+# or with asymmetric keys published at the project's JWKS endpoint.
+JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
+JWT_AUDIENCE = os.environ.get("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+TOKEN_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", 1024))
 
-def get_user_from_request():
-    """
-    Extract and verify user from request JWT token.
-    Returns user dict with email and id, or None if not authenticated.
-    """
-    access_token = None
-    
+_jwks_client = None
+if not JWT_SECRET and SUPABASE_URL:
+    # Keys are cached locally and only refetched for an unknown key id
+    _jwks_client = jwt.PyJWKClient(
+        f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+        cache_keys=True,
+        lifespan=3600,
+    )
+
+# token hash -> (user dict, exp timestamp), most recently used last
+_verified_tokens = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
+
+def _get_access_token():
+    """Get the raw access token from the Authorization header or Supabase auth cookie."""
     # Try to get access token from Authorization header
     auth_header = request.headers.get('Authorization')
     if auth_header and auth_header.startswith('Bearer '):
-        access_token = auth_header.split('Bearer ')[1]
+        return auth_header.split('Bearer ')[1]
+
+    # Try to get from cookies (Supabase stores tokens in cookies)
+    # Supabase cookie names follow pattern: sb-<project-ref>-auth-token
+    for cookie_name, cookie_value in request.cookies.items():
+        if 'auth-token' in cookie_name.lower():
+            try:
+                access_token = json.loads(cookie_value).get('access_token')
+                if access_token:
+                    return access_token
+            except (ValueError, AttributeError):
+                pass
+    return None
+
+
+def _decode_token(access_token):
+    """Verify the token's signature, expiry and audience, returning its claims."""
+    if JWT_SECRET:
+        key, algorithms = JWT_SECRET, ["HS256"]
+    elif _jwks_client is not None:
+        key, algorithms = _jwks_client.get_signing_key_from_jwt(access_token).key, ["RS256", "ES256"]
     else:
-        # Try to get from cookies (Supabase stores tokens in cookies)
-        # Supabase cookie names follow pattern: sb-<project-ref>-auth-token
-        for cookie_name, cookie_value in request.cookies.items():
-            if 'auth-token' in cookie_name.lower():
-                try:
-                    cookie_data = json.loads(cookie_value)
-                    access_token = cookie_data.get('access_token')
-                    if access_token:
-                        break
-                except:
-                    pass
-    
-    if not access_token:
-        return None
-    
+        raise jwt.InvalidTokenError("No SUPABASE_JWT_SECRET or SUPABASE_URL configured")
+
+    return jwt.decode(
+        access_token,
+        key,
+        algorithms=algorithms,
+        audience=JWT_AUDIENCE,
+        options={"require": ["exp", "sub"]},
+    )
+
+
+def verify_token(access_token):
+    """
+    Verify an access token and return user dict with email and id, or None.
+    Verified tokens are kept in a bounded LRU keyed by token hash until they expire,
+    so repeat requests with the same token skip signature verification.
+    """
+    token_key = hashlib.sha256(access_token.encode()).digest()
+    now = time.time()
+
+    with _verified_tokens_lock:
+        cached = _verified_tokens.get(token_key)
+        if cached:
+            if cached[1] > now:
+                _verified_tokens.move_to_end(token_key)
+                return cached[0]
+            del _verified_tokens[token_key]
+
     try:
-        decoded = jwt.decode(access_token, options={"verify_signature": False})
-        
-        user_email = decoded.get('email')
-        user_id = decoded.get('sub')
-        
-        if not user_email:
-            return None
-        
-        user_data = {
-            'email': user_email,
-            'id': user_id,
-        }
-        
-        return user_data
+        decoded = _decode_token(access_token)
     except Exception as e:
         print(f"Auth error: {e}")
         return None
 
+    user_email = decoded.get('email')
+    if not user_email:
+        return None
+
+    user_data = {
+        'email': user_email,
+        'id': decoded.get('sub'),
+    }
+
+    with _verified_tokens_lock:
+        _verified_tokens[token_key] = (user_data, decoded['exp'])
+        if len(_verified_tokens) > TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+
+    return user_data
+
+
+def get_user_from_request():
+    """
+    Extract and verify user from request JWT token.
+    Returns user dict with email and id, or None if not authenticated.
+    The result is memoized on `g`, so the token is parsed once per request.
+    """
+    if '_auth_user' not in g:
+        access_token = _get_access_token()
+        g._auth_user = verify_token(access_token) if access_token else None
+    return g._auth_user
+
+
 def require_auth(f):
     """
     Decorator to require authentication for a route.
@@ -63,4 +132,3 @@ def require_auth(f):
         g.current_user = user
         return f(*args, **kwargs)
     return decorated_function
-
@@ -0,0 +1,119 @@
+"""
+Shared validation for batched endpoints (bulk update / bulk upsert, key lookups).
+"""
+import os
+
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 1000))
+MAX_LOOKUP_SIZE = int(os.environ.get("MAX_LOOKUP_SIZE", 1000))
+
+# Range of a PostgreSQL integer column
+MIN_INT, MAX_INT = -2 ** 31, 2 ** 31 - 1
+
+
+def body_field(data, name):
+    """
+    Get `name` from a parsed JSON request body (None for an empty body).
+    Raises ValueError when the body is not a JSON object.
+    """
+    if data is None:
+        return None
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    return data.get(name)
+
+
+def _valid_value(value, field_type):
+    """Check a non-null field value against its column type (text unless int)."""
+    if field_type is int:
+        return type(value) is int and MIN_INT <= value <= MAX_INT
+    return isinstance(value, str)
+
+
+def prepare_records(records, key, allowed_fields, required_fields=(), partial=True, field_types=None):
+    """
+    Validate a batch of record dicts and turn them into row tuples.
+    With `partial`, every record must carry the same subset of `allowed_fields`
+    (taken from the first record); otherwise every allowed field is used and
+    absent ones become None. Values must be null or match `field_types`
+    (field -> int or str, str by default), since one bad value would fail the
+    whole statement. Returns (fields, rows) with each row as (key, *values).
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(records, list) or not records:
+        raise ValueError("No records provided")
+    if len(records) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} records per request")
+
+    if partial:
+        first = records[0] if isinstance(records[0], dict) else {}
+        fields = tuple(f for f in allowed_fields if f in first)
+        if not fields:
+            raise ValueError(f"Records must include at least one of: {', '.join(allowed_fields)}")
+    else:
+        fields = tuple(allowed_fields)
+
+    rows = []
+    seen = set()
+    for index, record in enumerate(records):
+        if not isinstance(record, dict) or record.get(key) in (None, ""):
+            raise ValueError(f"Record {index} is missing '{key}'")
+        # Keys come back from the database as text, so anything else could never match
+        if not isinstance(record[key], str):
+            raise ValueError(f"Record {index} has an invalid '{key}'")
+        if partial and tuple(f for f in allowed_fields if f in record) != fields:
+            raise ValueError(f"Record {index} must have the same fields as the first record")
+        for field in required_fields:
+            if not record.get(field):
+                raise ValueError(f"Record {index} is missing '{field}'")
+        for field in fields:
+            value = record.get(field)
+            if value is not None and not _valid_value(value, (field_types or {}).get(field, str)):
+                raise ValueError(f"Record {index} ({record[key]}) has an invalid '{field}'")
+        if record[key] in seen:
+            raise ValueError(f"Duplicate '{key}' in batch: {record[key]}")
+        seen.add(record[key])
+        rows.append((record[key], *(record.get(f) for f in fields)))
+    return fields, rows
+
+
+def build_results(rows, written, key):
+    """
+    Build per-record results in input order from the keys a statement returned.
+    `written` rows may carry an `inserted` flag (upserts); keys not returned are not_found.
+    """
+    statuses = {r[key]: "inserted" if r.get("inserted") else "updated" for r in written}
+    results = [{key: row[0], "status": statuses.get(row[0], "not_found")} for row in rows]
+    return {
+        "results": results,
+        "inserted": sum(1 for r in results if r["status"] == "inserted"),
+        "updated": sum(1 for r in results if r["status"] == "updated"),
+        "not_found": sum(1 for r in results if r["status"] == "not_found"),
+    }
+
+
+def prepare_keys(keys, name):
+    """
+    Validate a list of lookup keys sent as `name`.
+    Returns the distinct keys in first-seen order for the query.
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(keys, list) or not keys:
+        raise ValueError(f"No {name} provided")
+    if len(keys) > MAX_LOOKUP_SIZE:
+        raise ValueError(f"At most {MAX_LOOKUP_SIZE} {name} per request")
+    for index, key in enumerate(keys):
+        if not isinstance(key, str) or not key:
+            raise ValueError(f"Invalid value at {name}[{index}]")
+    return list(dict.fromkeys(keys))
+
+
+def order_by_keys(keys, found, key):
+    """
+    Arrange looked-up rows in the order of the requested `keys` (repeats included)
+    and list the keys that matched nothing.
+    """
+    index = {row[key]: row for row in found}
+    return {
+        "results": [index[k] for k in keys if k in index],
+        "missing": [k for k in dict.fromkeys(keys) if k not in index],
+    }
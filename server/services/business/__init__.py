@@ -3,6 +3,8 @@ from services.business import program_service
 from services.business import student_service
 from services.business import user_service
 from services.business import metrics_service
+from services.business import bootstrap_service
+from services.business import batch_service
 
 __all__ = [
     "college_service",
@@ -10,4 +12,6 @@ __all__ = [
     "student_service",
     "user_service",
     "metrics_service",
+    "bootstrap_service",
+    "batch_service",
 ]
@@ -0,0 +1,108 @@
+import psycopg2
+from services.batch import MAX_BATCH_SIZE
+from services.database import transaction
+from services.business import college_service, program_service, student_service
+
+ENTITIES = ("college", "program", "student")
+OPERATIONS = ("create", "update", "delete")
+
+
+def _create(entity, data):
+    """Create one row through its service, with the same fields the create routes take."""
+    if entity == "college":
+        return college_service.create(data["code"], data["name"])
+    if entity == "program":
+        return program_service.create(data["code"], data["name"], data["college_code"])
+    return student_service.create(
+        data["idNo"], data["firstName"], data["lastName"],
+        data.get("course"), data.get("year"), data.get("gender"), data.get("photo_path")
+    )
+
+
+def _update(entity, key, data):
+    """Update one row by key through its service, with the same fields the update routes take."""
+    if entity == "college":
+        return college_service.update(key, data.get("code"), data.get("name"))
+    if entity == "program":
+        return program_service.update(key, data["code"], data["name"], data["college_code"])
+    return student_service.update(
+        key, data["idNo"], data["firstName"], data["lastName"],
+        data.get("course"), data.get("year"), data.get("gender"), data.get("photo_path")
+    )
+
+
+def _delete(entity, key):
+    """Delete one row by key through its service."""
+    if entity == "college":
+        return college_service.delete(key)
+    if entity == "program":
+        return program_service.delete(key)
+    return student_service.delete(key)
+
+
+def _validate(operations):
+    """Check the shape of every operation before anything touches the database."""
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("No operations provided")
+    if len(operations) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} operations per request")
+
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise ValueError(f"Operation {index} must be an object")
+        if operation.get("op") not in OPERATIONS:
+            raise ValueError(f"Operation {index} has an invalid op: {operation.get('op')}")
+        if operation.get("entity") not in ENTITIES:
+            raise ValueError(f"Operation {index} has an invalid entity: {operation.get('entity')}")
+        if operation["op"] != "delete" and not isinstance(operation.get("data"), dict):
+            raise ValueError(f"Operation {index} is missing 'data'")
+        if operation["op"] != "create":
+            if not operation.get("key"):
+                raise ValueError(f"Operation {index} is missing 'key'")
+            # Keys are text columns; anything else would fail inside the transaction
+            if not isinstance(operation["key"], str):
+                raise ValueError(f"Operation {index} has an invalid 'key'")
+
+
+def run(operations):
+    """
+    Run an ordered list of create/update/delete operations on colleges, programs
+    and students through the regular service functions, on one connection and in
+    one transaction. Either every operation commits or none does.
+    Each operation is {"op", "entity", "key" (update/delete), "data" (create/update)}.
+    Returns per-operation results in order.
+    Raises ValueError naming the failing operation for bad input, missing rows
+    or constraint violations; the transaction is rolled back.
+    """
+    _validate(operations)
+
+    results = []
+    try:
+        with transaction():
+            for index, operation in enumerate(operations):
+                op, entity = operation["op"], operation["entity"]
+                try:
+                    if op == "create":
+                        row = _create(entity, operation["data"])
+                    elif op == "update":
+                        row = _update(entity, operation["key"], operation["data"])
+                    else:
+                        row = _delete(entity, operation["key"])
+                except KeyError as e:
+                    raise ValueError(f"Operation {index} is missing {e} in 'data'") from e
+                except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+                    detail = (e.pgerror or str(e)).strip()
+                    raise ValueError(f"Operation {index} ({op} {entity}) failed: {detail}") from e
+
+                if row is None:
+                    raise ValueError(f"Operation {index} ({op} {entity}): {operation['key']} not found")
+                results.append({"index": index, "op": op, "entity": entity, "result": row})
+    finally:
+        # The services invalidated the reference caches before the commit, so a
+        # concurrent read may have re-cached the old rows. The version bump would
+        # only catch that at the next recheck (CACHE_VERSION_CHECK_MS); dropping
+        # them again keeps this process's own reads current right away
+        college_service.invalidate_cache()
+        program_service.invalidate_cache()
+
+    return {"results": results}
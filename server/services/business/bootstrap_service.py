@@ -0,0 +1,20 @@
+from services.database import transaction
+from services.business import college_service, program_service, metrics_service, student_service
+
+
+def get_bootstrap(days=7, limit=None):
+    """
+    Gather everything the dashboard needs on first load: the reference lists,
+    table counts, daily metrics and the first page of students.
+    Every query shares one pooled connection and one read-only snapshot.
+    Raises ValueError for an out-of-range metrics window.
+    """
+    with transaction(readonly=True):
+        return {
+            # Bypass the reference caches so the lists come from the same snapshot
+            "colleges": college_service.get_all(cached=False),
+            "programs": program_service.get_all(cached=False),
+            "counts": metrics_service.get_all_counts(),
+            "daily": metrics_service.get_daily_metrics(days=days),
+            "students": student_service.get_page(limit=limit),
+        }
@@ -1,4 +1,9 @@
 from repositories import college_repository
+from services.batch import prepare_records, build_results, prepare_keys, order_by_keys
+from services.cache import SnapshotCache, VersionedCache
+from services.business import program_service
+
+COLUMNS = ("code", "name")
 
 
 def _format_college(row):
@@ -9,37 +14,114 @@ def _format_college(row):
     }
 
 
-def get_all():
-    """Get all colleges."""
-    rows = college_repository.get_all()
-    return [_format_college(r) for r in rows]
+def _load_all():
+    """Load all colleges for the reference cache."""
+    return [_format_college(r) for r in college_repository.get_all()]
+
+
+_cache = SnapshotCache("colleges", _load_all, key="code", table_names=("colleges",))
+
+
+def invalidate_cache():
+    """Drop cached colleges so the next read reloads them."""
+    _cache.invalidate()
+
+
+def _load_counts():
+    """Load per-college counts keyed by code."""
+    return {r["code"]: {"program_count": r["program_count"], "student_count": r["student_count"]} for r in college_repository.get_counts()}
+
+
+# Reused until the next write to any of the counted tables
+_counts_cache = VersionedCache("college_counts", _load_counts, ("colleges", "programs", "students"))
+
+
+def get_all(include_counts=False, cached=True):
+    """
+    Get all colleges (served from the reference cache), optionally with
+    per-row counts from the version-tagged counts cache. With `cached=False`
+    both are read from the database, e.g. to share a transaction's snapshot.
+    """
+    colleges = _cache.get_all() if cached else _load_all()
+    if not include_counts:
+        return colleges
+    counts = _counts_cache.get() if cached else _load_counts()
+    return [{**row, **counts.get(row["code"], {})} for row in colleges]
+
+
+def get_all_columnar():
+    """Get all colleges as column names plus value arrays (built from the reference cache)."""
+    return {
+        "columns": list(COLUMNS),
+        "rows": [[row[column] for column in COLUMNS] for row in _cache.get_all()],
+    }
+
+
+def iter_all(batch_size=1000):
+    """Stream all colleges one formatted row at a time."""
+    for row in college_repository.iter_all(batch_size):
+        yield _format_college(row)
 
 
 def get_by_code(code):
-    """Get a single college by code."""
-    row = college_repository.get_by_code(code)
-    return _format_college(row) if row else None
+    """Get a single college by code (served from the reference cache)."""
+    return _cache.get(code)
+
+
+def lookup(codes):
+    """
+    Get many colleges by code from the reference cache, in the requested order,
+    plus the codes that matched nothing. Raises ValueError for an invalid batch.
+    """
+    found = _cache.get_many(prepare_keys(codes, "codes"))
+    return order_by_keys(codes, [row for row in found if row], "code")
 
 
 def create(code, name):
     """Create a new college."""
     row = college_repository.create(code, name)
+    invalidate_cache()
     return _format_college(row)
 
 
 def update(code, new_code, new_name):
     """Update a college by code."""
     row = college_repository.update(code, new_code, new_name)
+    invalidate_cache()
+    program_service.invalidate_cache()
     return _format_college(row) if row else None
 
 
 def delete(code):
     """Delete a college by code."""
     row = college_repository.delete(code)
+    invalidate_cache()
+    program_service.invalidate_cache()
     return _format_college(row) if row else None
 
 
 def bulk_delete(codes):
     """Delete multiple colleges by codes."""
     deleted_rows = college_repository.bulk_delete(codes)
+    invalidate_cache()
+    program_service.invalidate_cache()
     return len(deleted_rows)
+
+
+def bulk_update(records):
+    """Update many colleges by code with one statement; records may carry any subset of fields."""
+    fields, rows = prepare_records(records, "code", college_repository.UPDATABLE_FIELDS)
+    updated = college_repository.bulk_update(rows, fields)
+    invalidate_cache()
+    return build_results(rows, updated, "code")
+
+
+def bulk_upsert(records):
+    """Insert or update many colleges by code with one statement."""
+    _, rows = prepare_records(
+        records, "code", college_repository.UPDATABLE_FIELDS,
+        required_fields=("name",), partial=False
+    )
+    written = college_repository.bulk_upsert(rows)
+    invalidate_cache()
+    return build_results(rows, written, "code")
@@ -1,45 +1,131 @@
 from datetime import date, timedelta
 from repositories import metrics_repository
+from services.cache import VersionedCache
 
 
-def get_all_counts():
-    """Get total counts for all tables."""
+COUNTED_TABLES = ("colleges", "programs", "students", "users")
+
+
+def get_all_counts(approximate=False):
+    """
+    Get total counts for all tables in a single lookup.
+    Exact counts come from the trigger-maintained counters table; with
+    `approximate` they come from the planner's statistics instead.
+    Falls back to COUNT(*) for any table without a counter.
+    """
+    if approximate:
+        counts = metrics_repository.get_estimated_counts(COUNTED_TABLES)
+    else:
+        counts = metrics_repository.get_row_counts(COUNTED_TABLES)
+
     return {
-        "colleges": metrics_repository.get_table_count("colleges"),
-        "programs": metrics_repository.get_table_count("programs"),
-        "students": metrics_repository.get_table_count("students"),
-        "users": metrics_repository.get_table_count("users"),
+        table: counts[table] if table in counts else metrics_repository.get_table_count(table)
+        for table in COUNTED_TABLES
     }
 
 
-def get_daily_metrics(days=7):
-    """Get daily metrics for the last N days."""
+MAX_METRICS_DAYS = 366
+METRIC_BUCKETS = ("day", "week", "month")
+
+# Table name -> key used in the daily metrics payload
+METRIC_KEYS = {
+    "colleges": "college",
+    "programs": "program",
+    "students": "students",
+    "users": "users",
+}
+
+
+def _bucket_start(day, bucket):
+    """Truncate a date to the start of its day/week/month bucket (weeks start Monday)."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day, bucket):
+    """Get the start of the bucket following the one starting at `day`."""
+    if bucket == "week":
+        return day + timedelta(days=7)
+    if bucket == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def get_daily_metrics(days=7, bucket="day"):
+    """
+    Get created-row metrics for the last N days, grouped by day, week or month.
+    Reads the daily rollup table with one query for all tables.
+    Raises ValueError for an out-of-range window or unknown bucket.
+    """
+    if not 1 <= days <= MAX_METRICS_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_METRICS_DAYS}")
+    if bucket not in METRIC_BUCKETS:
+        raise ValueError(f"Invalid bucket: {bucket}")
+
     today = date.today()
-    start = today - timedelta(days=days - 1)
+    start = _bucket_start(today - timedelta(days=days - 1), bucket)
     end = today + timedelta(days=1)  # Include entire day
-    
+
     # Build date buckets
-    date_list = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    date_list = []
+    current = start
+    while current < end:
+        date_list.append(current.isoformat())
+        current = _next_bucket(current, bucket)
     result_map = {
-        d: {"date": d, "college": 0, "program": 0, "students": 0, "users": 0}
+        d: {"date": d, **{key: 0 for key in METRIC_KEYS.values()}}
         for d in date_list
     }
-    
-    # Get counts for each table
-    tables = {
-        "colleges": "college",
-        "programs": "program",
-        "students": "students",
-        "users": "users",
-    }
-    
-    for table_name, result_key in tables.items():
-        rows = metrics_repository.get_daily_counts(
-            table_name, start.isoformat(), end.isoformat()
-        )
-        for row in rows:
-            day_str = row['day'].isoformat() if hasattr(row['day'], 'isoformat') else str(row['day'])
-            if day_str in result_map:
-                result_map[day_str][result_key] = row['count']
-    
+
+    rows = metrics_repository.get_bucketed_counts(
+        METRIC_KEYS.keys(), bucket, start.isoformat(), end.isoformat()
+    )
+    for row in rows:
+        day_str = row['bucket'].isoformat() if hasattr(row['bucket'], 'isoformat') else str(row['bucket'])
+        if day_str in result_map:
+            result_map[day_str][METRIC_KEYS[row['table_name']]] = row['count']
+
     return [result_map[d] for d in date_list]
+
+
+# Student columns a breakdown can be grouped by (also the SQL whitelist)
+BREAKDOWN_DIMENSIONS = ("college_code", "course", "year", "gender")
+
+
+def _load_breakdown(dimensions):
+    """Run the breakdown query and group its rows per dimension."""
+    full_mask = (1 << len(dimensions)) - 1
+    result = {"total": 0, **{d: [] for d in dimensions}}
+    for row in metrics_repository.get_breakdown(dimensions):
+        mask = row["grouping_mask"]
+        if mask == full_mask:
+            result["total"] = row["count"]
+            continue
+        # The one dimension grouped in this row is the only bit left unset
+        for position, dimension in enumerate(dimensions):
+            if mask == full_mask ^ (1 << (len(dimensions) - 1 - position)):
+                result[dimension].append({"value": row[dimension], "count": row["count"]})
+                break
+    return result
+
+
+# Reused until the next write to students or programs (course renames cascade)
+_breakdown_cache = VersionedCache("breakdown", _load_breakdown, ("students", "programs"))
+
+
+def get_breakdown(by=None):
+    """
+    Get student counts per value of each requested dimension (all by default),
+    sorted by count, plus the total. Raises ValueError for unknown dimensions.
+    """
+    requested = {d.strip() for d in (by or "").split(",") if d.strip()}
+    unknown = requested - set(BREAKDOWN_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Invalid breakdown dimension: {', '.join(sorted(unknown))}")
+
+    # Canonical order so equivalent requests share a cache entry
+    dimensions = tuple(d for d in BREAKDOWN_DIMENSIONS if not requested or d in requested)
+    return _breakdown_cache.get(dimensions)
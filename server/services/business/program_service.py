@@ -1,4 +1,8 @@
 from repositories import program_repository
+from services.batch import prepare_records, build_results, prepare_keys, order_by_keys
+from services.cache import SnapshotCache, VersionedCache
+
+COLUMNS = ("code", "name", "college_code")
 
 
 def _format_program(row):
@@ -10,37 +14,111 @@ def _format_program(row):
     }
 
 
-def get_all():
-    """Get all programs."""
-    rows = program_repository.get_all()
-    return [_format_program(r) for r in rows]
+def _load_all():
+    """Load all programs for the reference cache."""
+    return [_format_program(r) for r in program_repository.get_all()]
+
+
+_cache = SnapshotCache("programs", _load_all, key="code", table_names=("programs",))
+
+
+def invalidate_cache():
+    """Drop cached programs so the next read reloads them."""
+    _cache.invalidate()
+
+
+def _load_counts():
+    """Load per-program counts keyed by code."""
+    return {r["code"]: {"student_count": r["student_count"]} for r in program_repository.get_counts()}
+
+
+# Reused until the next write to any of the counted tables
+_counts_cache = VersionedCache("program_counts", _load_counts, ("programs", "students"))
+
+
+def get_all(include_counts=False, cached=True):
+    """
+    Get all programs (served from the reference cache), optionally with
+    per-row counts from the version-tagged counts cache. With `cached=False`
+    both are read from the database, e.g. to share a transaction's snapshot.
+    """
+    programs = _cache.get_all() if cached else _load_all()
+    if not include_counts:
+        return programs
+    counts = _counts_cache.get() if cached else _load_counts()
+    return [{**row, **counts.get(row["code"], {})} for row in programs]
+
+
+def get_all_columnar():
+    """Get all programs as column names plus value arrays (built from the reference cache)."""
+    return {
+        "columns": list(COLUMNS),
+        "rows": [[row[column] for column in COLUMNS] for row in _cache.get_all()],
+    }
+
+
+def iter_all(batch_size=1000):
+    """Stream all programs one formatted row at a time."""
+    for row in program_repository.iter_all(batch_size):
+        yield _format_program(row)
 
 
 def get_by_code(code):
-    """Get a single program by code."""
-    row = program_repository.get_by_code(code)
-    return _format_program(row) if row else None
+    """Get a single program by code (served from the reference cache)."""
+    return _cache.get(code)
+
+
+def lookup(codes):
+    """
+    Get many programs by code from the reference cache, in the requested order,
+    plus the codes that matched nothing. Raises ValueError for an invalid batch.
+    """
+    found = _cache.get_many(prepare_keys(codes, "codes"))
+    return order_by_keys(codes, [row for row in found if row], "code")
 
 
 def create(code, name, college_code):
     """Create a new program."""
     row = program_repository.create(code, name, college_code)
+    invalidate_cache()
     return _format_program(row)
 
 
 def update(code, new_code, new_name, new_college_code):
     """Update a program by code."""
     row = program_repository.update(code, new_code, new_name, new_college_code)
+    invalidate_cache()
     return _format_program(row) if row else None
 
 
 def delete(code):
     """Delete a program by code."""
     row = program_repository.delete(code)
+    invalidate_cache()
     return _format_program(row) if row else None
 
 
 def bulk_delete(codes):
     """Delete multiple programs by codes."""
     deleted_rows = program_repository.bulk_delete(codes)
+    invalidate_cache()
     return len(deleted_rows)
+
+
+def bulk_update(records):
+    """Update many programs by code with one statement; records may carry any subset of fields."""
+    fields, rows = prepare_records(records, "code", program_repository.UPDATABLE_FIELDS)
+    updated = program_repository.bulk_update(rows, fields)
+    invalidate_cache()
+    return build_results(rows, updated, "code")
+
+
+def bulk_upsert(records):
+    """Insert or update many programs by code with one statement."""
+    _, rows = prepare_records(
+        records, "code", program_repository.UPDATABLE_FIELDS,
+        required_fields=("name", "college_code"), partial=False
+    )
+    written = program_repository.bulk_upsert(rows)
+    invalidate_cache()
+    return build_results(rows, written, "code")
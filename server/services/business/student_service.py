@@ -1,4 +1,21 @@
+import base64
+import csv
+import io
+import itertools
+import json
 from repositories import student_repository
+from services.batch import prepare_records, build_results, prepare_keys, order_by_keys
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_IMPORT_ERRORS = 1000
+# Non-text columns accepted by bulk update/upsert
+BULK_FIELD_TYPES = {"year": int}
+IMPORT_FIELDS = ("idNo", "firstName", "lastName", "course", "year", "gender", "photo_path")
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Shorter queries can't use the trigram indexes, so they only match idNo prefixes
+MIN_NAME_SEARCH_LENGTH = 3
 
 
 def _format_student(row):
@@ -21,12 +38,119 @@ def get_all():
     return [_format_student(r) for r in rows]
 
 
+def get_all_columnar():
+    """Get all students as column names plus one value tuple per row (no per-row dicts)."""
+    columns, rows = student_repository.get_all_columnar()
+    return {"columns": columns, "rows": rows}
+
+
+def _encode_cursor(row, scope):
+    """
+    Encode the keyset position of a row as an opaque URL-safe token, together
+    with the sort/order/filters `scope` it is only valid under.
+    """
+    raw = json.dumps({"position": [row["sort_key"], row["idNo"]], "scope": scope}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(token, scope):
+    """
+    Decode a cursor token back into its (sort value, idNo) pair.
+    Raises ValueError if it is malformed or was issued for a different scope.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        cursor = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(cursor, dict):
+        raise ValueError("Invalid cursor")
+    position = cursor.get("position")
+    if not isinstance(position, list) or len(position) != 2:
+        raise ValueError("Invalid cursor")
+    if cursor.get("scope") != scope:
+        raise ValueError("Cursor does not match the requested sort, order or filters")
+    # The values are bound straight into the keyset predicate, so they must match the column types
+    sort_type = int if scope["sort"] == "year" else str
+    sort_value, id_no = position
+    if type(sort_value) is not sort_type or not isinstance(id_no, str):
+        raise ValueError("Invalid cursor")
+    return tuple(position)
+
+
+def get_page(limit=None, after=None, sort="idNo", order="asc", filters=None):
+    """
+    Get one page of students using keyset pagination.
+    Returns the page rows plus the cursor for the next page (None on the last page).
+    Raises ValueError for unknown sort keys, bad filters, malformed cursors or
+    cursors issued under a different sort, order or filters.
+    """
+    if sort not in student_repository.SORT_COLUMNS:
+        raise ValueError(f"Invalid sort column: {sort}")
+    if order not in ("asc", "desc"):
+        raise ValueError(f"Invalid sort order: {order}")
+
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+    for key in filters:
+        if key not in student_repository.FILTER_COLUMNS:
+            raise ValueError(f"Invalid filter: {key}")
+    if "year" in filters:
+        try:
+            filters["year"] = int(filters["year"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid year: {filters['year']}")
+
+    limit = DEFAULT_PAGE_SIZE if limit is None else max(1, min(int(limit), MAX_PAGE_SIZE))
+    scope = {"sort": sort, "order": order, "filters": filters}
+    position = _decode_cursor(after, scope) if after else None
+
+    rows = student_repository.get_page(
+        limit, sort=sort, descending=order == "desc", after=position, filters=filters
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "data": [_format_student(r) for r in rows],
+        "next_cursor": _encode_cursor(rows[-1], scope) if has_more else None,
+        "limit": limit,
+    }
+
+
+def iter_all(batch_size=1000):
+    """Stream all students one formatted row at a time."""
+    for row in student_repository.iter_all(batch_size):
+        yield _format_student(row)
+
+
 def get_by_id(id_no):
     """Get a single student by idNo."""
     row = student_repository.get_by_id(id_no)
     return _format_student(row) if row else None
 
 
+def lookup(ids):
+    """
+    Get many students by idNo with one query, in the requested order,
+    plus the idNos that matched nothing. Raises ValueError for an invalid batch.
+    """
+    rows = student_repository.get_by_ids(prepare_keys(ids, "ids"))
+    return order_by_keys(ids, [_format_student(r) for r in rows], "idNo")
+
+
+def search(query, limit=None):
+    """
+    Search students by ID prefix or name (names only for queries of at least
+    MIN_NAME_SEARCH_LENGTH characters). Raises ValueError on an empty query.
+    """
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("Search query is required")
+    limit = DEFAULT_SEARCH_LIMIT if limit is None else max(1, min(int(limit), MAX_SEARCH_LIMIT))
+    rows = student_repository.search(query, limit, match_names=len(query) >= MIN_NAME_SEARCH_LENGTH)
+    return [_format_student(r) for r in rows]
+
+
 def create(id_no, first_name, last_name, course, year, gender, photo_path):
     """Create a new student."""
     row = student_repository.create(
@@ -53,3 +177,113 @@ def bulk_delete(ids):
     """Delete multiple students by idNo."""
     deleted_rows = student_repository.bulk_delete(ids)
     return len(deleted_rows)
+
+
+def _parse_csv(stream, errors):
+    """Yield (line, record) pairs from a CSV upload with a header row, recording malformed rows."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    missing = {"idNo", "firstName", "lastName"} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+    records = iter(reader)
+    while True:
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # line_num still points at the last row read successfully
+            errors.append({"line": reader.line_num + 1, "idNo": None, "error": f"Malformed CSV row: {e}"})
+            continue
+        yield reader.line_num, record
+
+
+def _parse_ndjson(stream, errors):
+    """Yield (line, record) pairs from an NDJSON upload, recording unparsable lines."""
+    for line_num, raw in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            errors.append({"line": line_num, "idNo": None, "error": "Invalid JSON"})
+            continue
+        if not isinstance(record, dict):
+            errors.append({"line": line_num, "idNo": None, "error": "Expected a JSON object"})
+            continue
+        yield line_num, record
+
+
+def _import_row(line_num, record):
+    """Convert a parsed record into a staging-table tuple; blank values become NULL."""
+    values = []
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        values.append(value)
+    return (line_num, *values)
+
+
+def import_students(stream, fmt="csv", upsert=False):
+    """
+    Bulk import students from a CSV or NDJSON byte stream.
+    Valid rows are written in one transaction; invalid rows are skipped and reported.
+    Raises ValueError for an unsupported format, bad CSV header or empty upload.
+    """
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    errors = []
+    parse = _parse_csv if fmt == "csv" else _parse_ndjson
+    records = parse(stream, errors)
+    # Pull the first record up front so header problems surface before touching the DB
+    first = next(records, None)
+    if first is None and not errors:
+        raise ValueError("No rows to import")
+
+    def rows():
+        pending = [first] if first is not None else []
+        for line_num, record in itertools.chain(pending, records):
+            row = _import_row(line_num, record)
+            # PostgreSQL text can't hold NUL, and one would fail the whole COPY
+            if any(isinstance(value, str) and "\x00" in value for value in row):
+                errors.append({"line": line_num, "idNo": None, "error": "Invalid NUL character"})
+                continue
+            yield row
+
+    written, rejected = student_repository.import_rows(rows(), upsert=upsert)
+    errors.extend(dict(r) for r in rejected)
+    errors.sort(key=lambda e: e["line"])
+
+    inserted = sum(1 for r in written if r["inserted"])
+    return {
+        "inserted": inserted,
+        "updated": len(written) - inserted,
+        "failed": len(errors),
+        "errors": errors[:MAX_IMPORT_ERRORS],
+    }
+
+
+def bulk_update(records):
+    """Update many students by idNo with one statement; records may carry any subset of fields."""
+    fields, rows = prepare_records(
+        records, "idNo", student_repository.UPDATABLE_FIELDS, field_types=BULK_FIELD_TYPES
+    )
+    updated = student_repository.bulk_update(rows, fields)
+    return build_results(rows, updated, "idNo")
+
+
+def bulk_upsert(records):
+    """Insert or update many students by idNo with one statement."""
+    _, rows = prepare_records(
+        records, "idNo", student_repository.UPDATABLE_FIELDS,
+        required_fields=("firstName", "lastName"), partial=False, field_types=BULK_FIELD_TYPES
+    )
+    written = student_repository.bulk_upsert(rows)
+    return build_results(rows, written, "idNo")
+
+
+def resync_college_codes():
+    """Repair students whose college_code no longer matches their program's college."""
+    return {"updated": student_repository.resync_college_codes()}
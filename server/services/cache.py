@@ -0,0 +1,200 @@
+"""
+In-process read-through caches.
+
+SnapshotCache holds one snapshot of a small reference table (colleges, programs);
+VersionedCache holds computed results (aggregates). Both are reused until one of
+the tables they read gets a new version counter, from any process. The counters
+are looked up at most once per VERSION_CHECK_INTERVAL per process, so another
+worker's writes show up within that interval while steady-state reads skip the
+database; the caches are also dropped on this process's own writes.
+Versions are read before loading, so a write racing the load only makes a later
+read reload early, never serve stale data past the interval.
+"""
+import os
+import threading
+import time
+from flask import g, has_request_context
+from repositories import version_repository
+
+DEFAULT_TTL = float(os.environ.get("REFERENCE_CACHE_TTL", 300))
+VERSION_CHECK_INTERVAL = float(os.environ.get("CACHE_VERSION_CHECK_MS", 1000)) / 1000
+
+# All caches created in this process, for stats reporting
+_caches = []
+
+# Table names tuple -> (versions, monotonic time they were read)
+_checked_versions = {}
+
+
+def current_versions(table_names):
+    """
+    Get the version counters of `table_names`, reusing the ones conditional()
+    already read for this request, or ones read in the last
+    VERSION_CHECK_INTERVAL, instead of querying them again.
+    """
+    table_names = tuple(table_names)
+    now = time.monotonic()
+    known = g.get("table_versions", {}) if has_request_context() else {}
+    if all(table in known for table in table_names):
+        versions = {table: known[table] for table in table_names}
+        _checked_versions[table_names] = (versions, now)
+        return versions
+
+    checked = _checked_versions.get(table_names)
+    if checked is not None and now - checked[1] < VERSION_CHECK_INTERVAL:
+        return checked[0]
+    versions = version_repository.get_versions(table_names)
+    _checked_versions[table_names] = (versions, now)
+    return versions
+
+
+class SnapshotCache:
+    """
+    Cache a full table snapshot as a list plus a key -> row index, tagged with
+    the version counters of `table_names` at load time. A read reloads it once
+    any counter moved, so every worker sees another worker's writes within
+    VERSION_CHECK_INTERVAL. Until the tables have counters, the snapshot
+    expires after `ttl`.
+    """
+
+    def __init__(self, name, loader, key, table_names, ttl=DEFAULT_TTL):
+        self.name = name
+        self._loader = loader
+        self._key = key
+        self._table_names = tuple(table_names)
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # (rows, index, versions, expires_at), swapped as a whole
+        self._snapshot_state = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.append(self)
+
+    def _is_fresh(self, state, versions):
+        """Check a snapshot against the current versions (or its TTL without them)."""
+        if state is None:
+            return False
+        if len(versions) == len(self._table_names):
+            return state[2] == versions
+        return time.monotonic() < state[3]
+
+    def _snapshot(self):
+        """Return the current (rows, index) pair, loading it on a miss."""
+        versions = current_versions(self._table_names)
+        state = self._snapshot_state
+        if self._is_fresh(state, versions):
+            self.hits += 1
+            return state[0], state[1]
+
+        with self._lock:
+            # Another thread may have refreshed it while we waited
+            state = self._snapshot_state
+            if self._is_fresh(state, versions):
+                self.hits += 1
+                return state[0], state[1]
+            if state is not None:
+                self.evictions += 1
+            self.misses += 1
+            rows = self._loader()
+            index = {row[self._key]: row for row in rows}
+            self._snapshot_state = (rows, index, versions, time.monotonic() + self._ttl)
+            return rows, index
+
+    def get_all(self):
+        """Get every cached row."""
+        rows, _ = self._snapshot()
+        return list(rows)
+
+    def get(self, key):
+        """Get a single cached row by key, or None."""
+        _, index = self._snapshot()
+        return index.get(key)
+
+    def get_many(self, keys):
+        """Get the cached row (or None) for each key, all from one snapshot."""
+        _, index = self._snapshot()
+        return [index.get(key) for key in keys]
+
+    def invalidate(self):
+        """Drop the snapshot so the next read reloads it."""
+        with self._lock:
+            if self._snapshot_state is not None:
+                self.evictions += 1
+            self._snapshot_state = None
+
+    def stats(self):
+        """Get hit/miss/eviction counters for this cache."""
+        state = self._snapshot_state
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(state[0]) if state is not None else 0,
+            "tables": list(self._table_names),
+            "ttl": self._ttl,
+        }
+
+
+class VersionedCache:
+    """
+    Cache loader results per argument tuple, tagged with the version counters of
+    `table_names` at load time, reloading only when a counter moved. Until the
+    tables have counters every read goes to the loader.
+    """
+
+    def __init__(self, name, loader, table_names):
+        self.name = name
+        self._loader = loader
+        self._table_names = tuple(table_names)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.append(self)
+
+    def get(self, *args):
+        """Get the loader result for `args`, reloading it if its tables changed."""
+        versions = current_versions(self._table_names)
+        if len(versions) != len(self._table_names):
+            self.misses += 1
+            return self._loader(*args)
+
+        entry = self._entries.get(args)
+        if entry is not None and entry[0] == versions:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(args)
+            if entry is not None and entry[0] == versions:
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self.evictions += 1
+            self.misses += 1
+            value = self._loader(*args)
+            self._entries[args] = (versions, value)
+            return value
+
+    def invalidate(self):
+        """Drop every cached result."""
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries = {}
+
+    def stats(self):
+        """Get hit/miss/eviction counters for this cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "tables": list(self._table_names),
+        }
+
+
+def get_cache_stats():
+    """Get stats for every cache in this process."""
+    return {cache.name: cache.stats() for cache in _caches}
@@ -0,0 +1,66 @@
+"""
+Negotiated gzip/brotli compression for API responses above a size threshold.
+Brotli is used only when the optional `brotli` module is installed.
+
+Environment:
+    COMPRESS_MIN_BYTES  smallest body worth compressing (default 1024)
+    COMPRESS_GZIP_LEVEL gzip level 1-9 (default 6)
+    COMPRESS_BR_QUALITY brotli quality 0-11 (default 4)
+"""
+import gzip
+import os
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+BR_QUALITY = int(os.environ.get("COMPRESS_BR_QUALITY", 4))
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/plain", "text/csv")
+
+# Compressed bodies get the encoding appended to their strong ETag
+ETAG_SUFFIXES = ("-br", "-gzip")
+
+
+def _choose_encoding():
+    if brotli is not None and request.accept_encodings["br"]:
+        return "br"
+    if request.accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response):
+    """after_request hook: compress eligible /api/* responses in place."""
+    if (
+        not request.path.startswith("/api/")
+        or response.status_code != 200
+        or response.is_streamed
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < MIN_BYTES:
+        return response
+
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=BR_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
@@ -2,80 +2,401 @@
 PostgreSQL database connection pool using psycopg2.
 Connects directly to Supabase's PostgreSQL database for raw SQL queries.
 """
+import contextvars
+import csv
+import itertools
 import os
+import re
+import tempfile
+import threading
+import time
 from contextlib import contextmanager
-from psycopg2 import pool
-from psycopg2.extras import RealDictCursor
+import psycopg2
+from psycopg2 import errors, extensions
+from psycopg2.extras import RealDictCursor, execute_values
+from services.pool import BlockingConnectionPool
+from services.instrumentation import record_query, record_pool_wait
+from services import slow_query_log
 
 # Connection pool - initialized lazily
 _connection_pool = None
+_pool_lock = threading.Lock()
+
+# Named statements prepared lazily on each pooled connection. Off unless
+# DB_PREPARED_STATEMENTS=1, and always off behind a transaction-mode pooler
+# (Supabase's port 6543), where PREPARE and a later EXECUTE can land on
+# different server connections.
+PREPARED_STATEMENTS_REQUESTED = os.environ.get("DB_PREPARED_STATEMENTS", "0").lower() in ("1", "true")
+TRANSACTION_POOLER_PORTS = ("6543",)
+_statements = {}
+_prepared_statements_enabled = None
+
+# In-memory size of a COPY buffer before it spills to a temporary file
+COPY_SPOOL_BYTES = 8 * 1024 * 1024
+# Rows per INSERT when copy_rows can't use COPY (under a wait callback)
+COPY_INSERT_PAGE_SIZE = 1000
+# Wait callback installed through set_wait_callback (None when serving with threads)
+_wait_callback = None
+
+# Connection bound by transaction(); get_db_connection hands it out instead of the pool
+_current_connection = contextvars.ContextVar("current_connection", default=None)
+
+
+class TrackedConnection(extensions.connection):
+    """psycopg2 connection that remembers which registered statements it has prepared."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
 
 
 def get_connection_pool():
-    """Get or create the connection pool."""
+    """
+    Get or create the connection pool.
+    Sizing and recycling are configured through DB_POOL_MIN, DB_POOL_MAX,
+    DB_POOL_TIMEOUT, DB_POOL_MAX_AGE, DB_POOL_MAX_IDLE and DB_POOL_PING_AFTER (seconds).
+    """
     global _connection_pool
     
     if _connection_pool is None:
-        database_url = os.environ.get("DATABASE_URL")
-        
-        if not database_url:
-            raise ValueError(
-                "DATABASE_URL environment variable is required. "
-                "Get it from Supabase Dashboard > Settings > Database > Connection string"
-            )
-        
-        _connection_pool = pool.ThreadedConnectionPool(
-            minconn=1,
-            maxconn=10,
-            dsn=database_url
-        )
+        with _pool_lock:
+            if _connection_pool is None:
+                database_url = os.environ.get("DATABASE_URL")
+                
+                if not database_url:
+                    raise ValueError(
+                        "DATABASE_URL environment variable is required. "
+                        "Get it from Supabase Dashboard > Settings > Database > Connection string"
+                    )
+                
+                _connection_pool = BlockingConnectionPool(
+                    dsn=database_url,
+                    minconn=int(os.environ.get("DB_POOL_MIN", 1)),
+                    maxconn=int(os.environ.get("DB_POOL_MAX", 10)),
+                    timeout=float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+                    max_age=float(os.environ.get("DB_POOL_MAX_AGE", 1800)),
+                    max_idle=float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+                    ping_after=float(os.environ.get("DB_POOL_PING_AFTER", 30)),
+                    connection_factory=TrackedConnection,
+                )
     
     return _connection_pool
 
 
+class _TimedCursorMixin:
+    """
+    Reports the duration of every execute/COPY to the request instrumentation,
+    and hands slow executes to the slow-query log.
+    """
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        finally:
+            duration = time.perf_counter() - started
+            record_query(duration)
+        slow_query_log.check(self, query, vars, duration)
+        return result
+
+    def copy_expert(self, sql, file, size=8192):
+        started = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            record_query(time.perf_counter() - started)
+
+
+_timed_cursor_classes = {}
+
+
+def _timed_cursor_class(cursor_factory):
+    """Get (and memoize) a timed subclass of the given cursor class."""
+    cursor_factory = cursor_factory or extensions.cursor
+    timed = _timed_cursor_classes.get(cursor_factory)
+    if timed is None:
+        timed = type(f"Timed{cursor_factory.__name__}", (_TimedCursorMixin, cursor_factory), {})
+        _timed_cursor_classes[cursor_factory] = timed
+    return timed
+
+
+def get_pool_stats():
+    """Get connection pool usage stats, or None before the pool is created."""
+    return _connection_pool.stats() if _connection_pool is not None else None
+
+
 @contextmanager
-def get_db_connection():
+def get_db_connection(readonly=False):
     """
     Context manager for database connections.
     Automatically returns connection to pool after use.
     
+    With `readonly`, the connection runs in autocommit mode: each statement is
+    its own implicit transaction, so there is no BEGIN/COMMIT round trip and no
+    transaction held open while results are processed. Only use it for SELECTs.
+    
     Usage:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT * FROM students")
                 rows = cur.fetchall()
     """
+    conn = _current_connection.get()
+    if conn is not None:
+        # Inside transaction(): share its connection, which commits or rolls back once at the end
+        yield conn
+        return
+
     pool = get_connection_pool()
+    started = time.perf_counter()
     conn = pool.getconn()
+    record_pool_wait(time.perf_counter() - started)
+    broken = False
+    if readonly:
+        conn.autocommit = True
     try:
         yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
+        if not readonly:
+            conn.commit()
+    except Exception as e:
+        # A dropped connection can't be rolled back or reused. Other errors,
+        # including OperationalError subclasses such as statement timeouts,
+        # deadlocks and serialization failures, leave it healthy after a rollback.
+        broken = bool(conn.closed) or isinstance(e, psycopg2.InterfaceError)
+        if not broken and not readonly:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
         raise
     finally:
-        pool.putconn(conn)
+        if readonly and not conn.closed:
+            conn.autocommit = False
+        pool.putconn(conn, close=broken)
 
 
 @contextmanager
-def get_db_cursor(cursor_factory=RealDictCursor):
+def transaction(readonly=False):
+    """
+    Run every database call made inside the block (repositories, services) on one
+    pooled connection and in one transaction, committed when the block exits or
+    rolled back if it raises. Nested blocks join the outer transaction.
+    
+    With `readonly`, the transaction is READ ONLY and REPEATABLE READ, so all
+    reads in the block see the same snapshot.
+    
+    Usage:
+        with transaction(readonly=True):
+            colleges = college_service.get_all()
+            page = student_service.get_page()
+    """
+    if _current_connection.get() is not None:
+        yield _current_connection.get()
+        return
+
+    with get_db_connection() as conn:
+        if readonly:
+            with conn.cursor() as cur:
+                # First statement, so it applies to the transaction psycopg2 just opened
+                cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        token = _current_connection.set(conn)
+        try:
+            yield conn
+        finally:
+            _current_connection.reset(token)
+
+
+@contextmanager
+def get_db_cursor(cursor_factory=RealDictCursor, readonly=False):
     """
     Context manager that provides a cursor with automatic connection handling.
-    Returns rows as dictionaries by default.
+    Returns rows as dictionaries by default. Pass `readonly=True` for
+    single-round-trip SELECTs (see get_db_connection).
     
     Usage:
-        with get_db_cursor() as cur:
+        with get_db_cursor(readonly=True) as cur:
             cur.execute("SELECT * FROM students")
             rows = cur.fetchall()
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=cursor_factory)
+    with get_db_connection(readonly=readonly) as conn:
+        cursor = conn.cursor(cursor_factory=_timed_cursor_class(cursor_factory))
         try:
             yield cursor
         finally:
             cursor.close()
 
 
+def register_statement(name, query):
+    """
+    Register a query (with %s placeholders) under a statement name.
+    It is sent with PREPARE the first time a connection executes it and
+    with EXECUTE afterwards, so PostgreSQL parses and plans it once per connection.
+    Returns the name for use with execute_prepared.
+    """
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+        raise ValueError(f"Invalid statement name: {name}")
+    # Only positional placeholders map onto PREPARE's $1, $2, ...
+    if "%(" in query.replace("%%", ""):
+        raise ValueError(f"Named placeholders are not supported in prepared statement {name}")
+
+    count = 0
+
+    def number_placeholder(match):
+        nonlocal count
+        if match.group(0) == "%%":
+            return "%"
+        count += 1
+        return f"${count}"
+
+    prepared_query = re.sub(r"%%|%s", number_placeholder, query)
+    _statements[name] = (query, prepared_query, count)
+    return name
+
+
+def prepared_statements_enabled():
+    """Check (once) whether DB_PREPARED_STATEMENTS is on and DATABASE_URL isn't a transaction pooler."""
+    global _prepared_statements_enabled
+    if _prepared_statements_enabled is None:
+        enabled = PREPARED_STATEMENTS_REQUESTED
+        if enabled:
+            try:
+                port = extensions.parse_dsn(os.environ.get("DATABASE_URL", "")).get("port")
+            except psycopg2.ProgrammingError:
+                port = None
+            if port in TRANSACTION_POOLER_PORTS:
+                print(f"DB_PREPARED_STATEMENTS ignored: port {port} is a transaction-mode pooler")
+                enabled = False
+        _prepared_statements_enabled = enabled
+    return _prepared_statements_enabled
+
+
+def _in_transaction(conn):
+    """Check whether a failed statement on `conn` would abort an enclosing transaction."""
+    return not conn.autocommit or conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE
+
+
+def _prepare(cur, name, prepared_query):
+    """
+    PREPARE a statement on the cursor's connection, inside a savepoint when a
+    transaction is open so a failure can't abort it. Returns False if the
+    server refused because the name is already taken there.
+    """
+    conn = cur.connection
+    guarded = _in_transaction(conn)
+    if guarded:
+        cur.execute("SAVEPOINT prepare_statement")
+    try:
+        cur.execute(f"PREPARE {name} AS {prepared_query}")
+    except errors.DuplicatePreparedStatement:
+        if guarded:
+            cur.execute("ROLLBACK TO SAVEPOINT prepare_statement")
+        return False
+    if guarded:
+        cur.execute("RELEASE SAVEPOINT prepare_statement")
+    conn.prepared.add(name)
+    return True
+
+
+def execute_prepared(cur, name, params=()):
+    """
+    Execute a registered statement on `cur`, preparing it on this connection first if needed.
+    Connections from a reconnect start with nothing prepared and re-prepare transparently.
+    If the server already has the name (42P05) or forgot it (26000), only that name is
+    dropped from the connection's set and the query runs as a plain execute instead.
+    Falls back to plain execution when prepared statements are disabled.
+    """
+    query, prepared_query, count = _statements[name]
+    conn = cur.connection
+    prepared = getattr(conn, "prepared", None)
+    if prepared is None or not prepared_statements_enabled():
+        cur.execute(query, params)
+        return
+
+    if name not in prepared and not _prepare(cur, name, prepared_query):
+        cur.execute(query, params)
+        return
+
+    execute_sql = f"EXECUTE {name}({', '.join(['%s'] * count)})" if count else f"EXECUTE {name}"
+    try:
+        cur.execute(execute_sql, params)
+    except errors.InvalidSqlStatementName:
+        prepared.discard(name)
+        # Outside a transaction nothing was aborted. Inside one this can only follow
+        # a DEALLOCATE or a pooler switching servers, which prepared_statements_enabled()
+        # already rules out, so the transaction is lost and the error propagates.
+        if _in_transaction(conn):
+            raise
+        cur.execute(query, params)
+
+
+def stream_query(query, params=None, batch_size=1000, cursor_factory=RealDictCursor):
+    """
+    Generator that runs a query on a server-side (named) cursor and yields rows
+    as they arrive, fetching `batch_size` rows per round trip.
+    Nothing runs until the first row is requested; the pooled connection is
+    then held until the generator is exhausted or closed. Prime it before
+    handing it to a response (see streaming.stream_response) so checkout and
+    query errors surface before headers are sent.
+    
+    Usage:
+        for row in stream_query("SELECT * FROM students"):
+            ...
+    """
+    with get_db_connection() as conn:
+        with conn.cursor(name="stream_cursor", cursor_factory=_timed_cursor_class(cursor_factory)) as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            for row in cur:
+                yield row
+
+
+def set_wait_callback(callback):
+    """
+    Install a psycopg2 wait callback (serve_async.py's gevent one) and remember
+    it, so copy_rows knows to avoid COPY, which can't run under one.
+    """
+    global _wait_callback
+    _wait_callback = callback
+    extensions.set_wait_callback(callback)
+
+
+@contextmanager
+def spool_rows(rows):
+    """
+    CSV-encode an iterable of row tuples into a spooled buffer (in memory up to
+    COPY_SPOOL_BYTES, then on disk) and yield it, rewound, for copy_rows.
+    None values are written as empty unquoted fields, which COPY reads as NULL.
+    Drain upload-backed rows here, before checking out a connection, so a slow
+    client never holds a pooled connection idle in a transaction.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=COPY_SPOOL_BYTES, mode="w+", newline="") as buffer:
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        buffer.seek(0)
+        yield buffer
+
+
+def copy_rows(cur, table, columns, buffer):
+    """
+    Load a buffer from spool_rows into `table` with COPY FROM STDIN.
+    psycopg2 refuses COPY while a wait callback is installed (serve_async.py),
+    and running it blocking would stall every other greenlet for the whole
+    load, so there the rows go in as multi-row INSERTs of COPY_INSERT_PAGE_SIZE
+    instead, each of which yields while it waits on the server.
+    """
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    if _wait_callback is None:
+        cur.copy_expert(f'COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+        return
+
+    # spool_rows writes None as an empty field; uploads already blank empty strings
+    rows = ([value or None for value in row] for row in csv.reader(buffer))
+    while True:
+        page = list(itertools.islice(rows, COPY_INSERT_PAGE_SIZE))
+        if not page:
+            break
+        execute_values(cur, f'INSERT INTO {table} ({column_list}) VALUES %s', page, page_size=len(page))
+
+
 def close_pool():
     """Close all connections in the pool. Call on app shutdown."""
     global _connection_pool
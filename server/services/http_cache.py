@@ -0,0 +1,62 @@
+from flask import g, request, make_response
+from functools import wraps
+import hashlib
+from repositories import version_repository
+from services.compression import ETAG_SUFFIXES
+
+
+def _build_etag(versions):
+    """Build an ETag from table versions and the parts of the request that shape the body."""
+    key = "|".join([
+        ",".join(f"{table}:{versions[table]}" for table in sorted(versions)),
+        request.query_string.decode(),
+        request.headers.get("Accept", ""),
+    ])
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def conditional(*table_names, include_tables=None):
+    """
+    Decorator for list routes backed by `table_names`.
+    Tags successful responses with a strong ETag derived from the tables'
+    version counters and answers a matching If-None-Match with 304
+    without running the route at all.
+    `include_tables` maps `?include=` values to the extra tables such a
+    response also reads (e.g. {"counts": ("students",)}).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            tables = table_names + tuple((include_tables or {}).get(request.args.get("include"), ()))
+            try:
+                versions = version_repository.get_versions(tables)
+            except Exception as e:
+                print(f"Table version lookup error: {e}")
+                return f(*args, **kwargs)
+
+            # Tables without a counter yet can't be cached safely
+            if len(versions) != len(tables):
+                return f(*args, **kwargs)
+
+            # Shared with the caches the route reads, so they skip their own lookup
+            g.table_versions = {**g.get("table_versions", {}), **versions}
+
+            etag = _build_etag(versions)
+            # Compressed responses carry the encoding as an ETag suffix
+            candidates = (etag,) + tuple(etag + suffix for suffix in ETAG_SUFFIXES)
+            matched = next((c for c in candidates if request.if_none_match.contains_weak(c)), None)
+            if matched:
+                response = make_response("", 304)
+                response.set_etag(matched)
+                # The body (and so the ETag) depends on Accept, e.g. NDJSON vs a JSON array
+                response.vary.add("Accept")
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "no-cache"
+                response.vary.add("Accept")
+            return response
+        return decorated_function
+    return decorator
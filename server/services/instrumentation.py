@@ -0,0 +1,121 @@
+"""
+In-process request and database instrumentation, exported in Prometheus text format.
+app.py times every request; get_db_connection/get_db_cursor report pool wait
+and query time into the current request so each endpoint's time can be split
+between Python, the pool and PostgreSQL.
+"""
+import threading
+import time
+from collections import defaultdict
+from flask import g, has_request_context, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+# (blueprint, endpoint, method) -> [bucket counts..., +Inf count], sum
+_latency_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+_latency_sum = defaultdict(float)
+# (blueprint, endpoint, method, status) -> count
+_status_counts = defaultdict(int)
+# (blueprint, endpoint, method) -> totals
+_response_bytes = defaultdict(int)
+_db_queries = defaultdict(int)
+_db_seconds = defaultdict(float)
+_pool_wait_seconds = defaultdict(float)
+
+
+def record_query(duration):
+    """Add one executed query and its duration to the current request."""
+    if has_request_context():
+        g._db_queries = g.get("_db_queries", 0) + 1
+        g._db_seconds = g.get("_db_seconds", 0.0) + duration
+
+
+def record_pool_wait(duration):
+    """Add time spent checking a connection out of the pool to the current request."""
+    if has_request_context():
+        g._pool_wait_seconds = g.get("_pool_wait_seconds", 0.0) + duration
+
+
+def start_request():
+    """Mark the start of a request (registered as a before_request hook)."""
+    g._request_started = time.perf_counter()
+
+
+def finish_request(response):
+    """Record latency, status, size and DB totals for a finished request (after_request hook)."""
+    started = g.get("_request_started")
+    if started is None:
+        return response
+    duration = time.perf_counter() - started
+    key = (request.blueprint or "app", request.endpoint or "unmatched", request.method)
+    size = response.content_length or 0
+
+    with _lock:
+        buckets = _latency_buckets[key]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                buckets[i] += 1
+        buckets[-1] += 1
+        _latency_sum[key] += duration
+        _status_counts[key + (response.status_code,)] += 1
+        _response_bytes[key] += size
+        _db_queries[key] += g.get("_db_queries", 0)
+        _db_seconds[key] += g.get("_db_seconds", 0.0)
+        _pool_wait_seconds[key] += g.get("_pool_wait_seconds", 0.0)
+    return response
+
+
+def _label_value(value):
+    """Escape a label value as the Prometheus text format requires."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key, **extra):
+    blueprint, endpoint, method = key[:3]
+    labels = {"blueprint": blueprint, "endpoint": endpoint, "method": method, **extra}
+    return ",".join(f'{name}="{_label_value(value)}"' for name, value in labels.items())
+
+
+def render_prometheus(pool_stats=None):
+    """Render all collected metrics (plus optional pool gauges) in Prometheus text format."""
+    lines = []
+    with _lock:
+        lines.append("# HELP http_request_duration_seconds Request latency by endpoint.")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for key, buckets in sorted(_latency_buckets.items()):
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                lines.append(f"http_request_duration_seconds_bucket{{{_labels(key, le=bound)}}} {count}")
+            lines.append(f'http_request_duration_seconds_bucket{{{_labels(key, le="+Inf")}}} {buckets[-1]}')
+            lines.append(f"http_request_duration_seconds_sum{{{_labels(key)}}} {_latency_sum[key]:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{_labels(key)}}} {buckets[-1]}")
+
+        lines.append("# HELP http_requests_total Requests by endpoint and status code.")
+        lines.append("# TYPE http_requests_total counter")
+        for key, count in sorted(_status_counts.items()):
+            lines.append(f"http_requests_total{{{_labels(key, status=key[3])}}} {count}")
+
+        counters = (
+            ("http_response_bytes_total", "Response body bytes sent (streamed bodies count as 0).", _response_bytes),
+            ("db_queries_total", "Queries executed while handling requests.", _db_queries),
+            ("db_query_seconds_total", "Time spent executing queries while handling requests.", _db_seconds),
+            ("db_pool_wait_seconds_total", "Time spent waiting for a pooled connection.", _pool_wait_seconds),
+        )
+        for name, help_text, values in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(values.items()):
+                formatted = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f"{name}{{{_labels(key)}}} {formatted}")
+
+    if pool_stats:
+        for name in ("max_size", "in_use", "idle", "waiting"):
+            lines.append(f"# TYPE db_pool_{name} gauge")
+            lines.append(f"db_pool_{name} {pool_stats[name]}")
+        for name in ("checkouts", "timeouts", "recycled", "failed_health_checks"):
+            lines.append(f"# TYPE db_pool_{name}_total counter")
+            lines.append(f"db_pool_{name}_total {pool_stats[name]}")
+        lines.append("# TYPE db_pool_checkout_wait_seconds_total counter")
+        lines.append(f"db_pool_checkout_wait_seconds_total {pool_stats['total_wait_seconds']}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,213 @@
+"""
+Thread-safe PostgreSQL connection pool with a bounded wait queue.
+Unlike psycopg2's ThreadedConnectionPool, checkout blocks (up to a timeout)
+when every connection is busy, and connections are health-checked and
+recycled by age and idle time before being handed out.
+"""
+import threading
+import time
+from collections import deque
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class BlockingConnectionPool:
+    """Connection pool whose getconn() waits for a free connection instead of failing."""
+
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=10.0,
+                 max_age=1800.0, max_idle=300.0, ping_after=30.0, connection_factory=None):
+        self._dsn = dsn
+        self._connection_factory = connection_factory
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()      # (conn, returned_at), most recently returned last
+        self._created = {}        # id(conn) -> created_at for every open connection
+        self._in_use = 0
+        self._opening = 0
+        self._closed = False
+
+        # Stats
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._failed_checks = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        for _ in range(minconn):
+            conn = self._connect()
+            self._idle.append((conn, time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(self._dsn, connection_factory=self._connection_factory)
+        self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_stale(self, conn, returned_at, now):
+        """Check whether an idle connection is closed or past its max age/idle time."""
+        if conn.closed:
+            return True
+        if self.max_age and now - self._created.get(id(conn), now) > self.max_age:
+            return True
+        return bool(self.max_idle) and now - returned_at > self.max_idle
+
+    def _prune_idle(self, now):
+        """
+        Close every stale idle connection, not just the ones checkout reaches.
+        Checkout takes the most recently returned connection, so under light load
+        the oldest would otherwise sit until a server or pooler timeout kills them.
+        """
+        fresh = deque()
+        for conn, returned_at in self._idle:
+            if self._is_stale(conn, returned_at, now):
+                self._recycled += 1
+                self._discard(conn)
+            else:
+                fresh.append((conn, returned_at))
+        self._idle = fresh
+
+    def _is_alive(self, conn):
+        """Cheap liveness probe for connections that sat idle a while."""
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        """
+        Check out a connection, waiting up to `timeout` seconds for one to free up.
+        Raises PoolError if none becomes available in time.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+
+                candidate = None
+                self._prune_idle(time.monotonic())
+                if self._idle:
+                    candidate = self._idle.pop()
+                    self._in_use += 1
+
+                must_open = False
+                if candidate is None:
+                    if self._in_use + self._opening < self.maxconn:
+                        self._opening += 1
+                        must_open = True
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolError(
+                                f"timed out after {self.timeout}s waiting for a database connection"
+                            )
+                        self._waiting += 1
+                        waited = True
+                        try:
+                            self._cond.wait(remaining)
+                        finally:
+                            self._waiting -= 1
+                        continue
+
+            if must_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._in_use += 1
+                break
+
+            # Validate outside the lock so a slow probe doesn't block other checkouts
+            conn, returned_at = candidate
+            if time.monotonic() - returned_at < self.ping_after or self._is_alive(conn):
+                break
+            with self._cond:
+                self._failed_checks += 1
+                self._in_use -= 1
+                self._discard(conn)
+                self._cond.notify()
+
+        with self._cond:
+            self._checkouts += 1
+            if waited:
+                wait = time.monotonic() - started
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool, discarding it if broken, expired or `close` is set."""
+        if not close and not conn.closed:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    close = True
+
+        with self._cond:
+            self._in_use -= 1
+            now = time.monotonic()
+            expired = self.max_age and now - self._created.get(id(conn), now) > self.max_age
+            if close or conn.closed or expired or self._closed:
+                if expired:
+                    self._recycled += 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, now))
+            self._prune_idle(now)
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+            self._cond.notify_all()
+
+    def stats(self):
+        """Get a snapshot of pool usage and wait statistics."""
+        with self._cond:
+            return {
+                "max_size": self.maxconn,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "failed_health_checks": self._failed_checks,
+                "total_wait_seconds": round(self._total_wait, 6),
+                "max_wait_seconds": round(self._max_wait, 6),
+            }
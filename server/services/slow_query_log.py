@@ -0,0 +1,150 @@
+"""
+Opt-in slow-query log. Enabled by setting SLOW_QUERY_MS; every query executed
+through get_db_cursor that takes longer is logged with its normalized SQL,
+redacted parameters, row count and calling repository function. A sample of
+slow SELECTs is re-run under EXPLAIN (ANALYZE, BUFFERS) by a background worker
+on its own pooled connection, never inside the caller's request or transaction.
+Entries are kept in a bounded in-memory ring buffer.
+
+Environment:
+    SLOW_QUERY_MS             threshold in milliseconds (unset = disabled)
+    SLOW_QUERY_EXPLAIN_RATE   fraction of slow SELECTs to EXPLAIN (default 0.1)
+    SLOW_QUERY_BUFFER_SIZE    entries kept in the ring buffer (default 100)
+    SLOW_QUERY_LOG_PARAMS     set to 1 to log raw parameter values
+"""
+import os
+import queue
+import random
+import re
+import sys
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+_threshold = os.environ.get("SLOW_QUERY_MS")
+THRESHOLD_SECONDS = float(_threshold) / 1000 if _threshold else None
+EXPLAIN_RATE = float(os.environ.get("SLOW_QUERY_EXPLAIN_RATE", 0.1))
+LOG_RAW_PARAMS = os.environ.get("SLOW_QUERY_LOG_PARAMS") == "1"
+
+_entries = deque(maxlen=int(os.environ.get("SLOW_QUERY_BUFFER_SIZE", 100)))
+_lock = threading.Lock()
+
+# Sampled plans waiting for the EXPLAIN worker; extra samples are skipped when full
+_explain_queue = queue.Queue(maxsize=10)
+_worker = None
+_worker_state = threading.local()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+# Not the digits of $1-style placeholders (prepared statements)
+_NUMBER_LITERAL = re.compile(r"(?<!\$)\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query):
+    """Collapse whitespace and replace inlined literals with `?`."""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", errors="replace")
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def _redact(value):
+    if LOG_RAW_PARAMS or value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__} len={len(str(value))}>"
+
+
+def redact_params(params):
+    """Replace parameter values with type/length placeholders unless raw logging is on."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _redact(value) for key, value in params.items()}
+    return [_redact(value) for value in params]
+
+
+def _find_caller():
+    """Name the repository function (module.function) that issued the query."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("repositories."):
+            return f"{module.split('.', 1)[1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _explain(text, params):
+    """Run EXPLAIN (ANALYZE, BUFFERS) for a SELECT on a read-only pooled connection of its own."""
+    # Imported here: services.database imports this module
+    from services.database import get_db_cursor
+    try:
+        with get_db_cursor(cursor_factory=None, readonly=True) as cur:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + text, params)
+            return "\n".join(row[0] for row in cur.fetchall())
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+
+
+def _explain_worker():
+    """Fill in the plan of each queued entry, one EXPLAIN at a time."""
+    # The EXPLAINs re-run slow queries; don't log them as slow queries themselves
+    _worker_state.active = True
+    while True:
+        entry, text, params = _explain_queue.get()
+        plan = _explain(text, params)
+        with _lock:
+            entry["plan"] = plan
+
+
+def _schedule_explain(entry, cursor, query, params):
+    """Queue a slow SELECT for EXPLAIN off the request path; the worker fills in entry["plan"]."""
+    text = query.decode("utf-8", errors="replace") if isinstance(query, bytes) else query
+    if not text.lstrip().upper().startswith("SELECT") or cursor.name is not None:
+        return
+
+    global _worker
+    with _lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_explain_worker, name="slow-query-explain", daemon=True)
+            _worker.start()
+    entry["plan"] = "EXPLAIN pending"
+    try:
+        _explain_queue.put_nowait((entry, text, params))
+    except queue.Full:
+        entry["plan"] = "EXPLAIN skipped: queue full"
+
+
+def check(cursor, query, params, duration):
+    """Log and buffer `query` if it ran longer than the threshold. No-op when disabled."""
+    if THRESHOLD_SECONDS is None or duration < THRESHOLD_SECONDS:
+        return
+    if getattr(_worker_state, "active", False):
+        return
+
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration * 1000, 3),
+        "sql": normalize_sql(query),
+        "params": redact_params(params),
+        "rows": cursor.rowcount,
+        "caller": _find_caller(),
+        "plan": None,
+    }
+    if random.random() < EXPLAIN_RATE:
+        _schedule_explain(entry, cursor, query, params)
+    print(
+        f"Slow query ({entry['duration_ms']} ms, {entry['rows']} rows) "
+        f"in {entry['caller']}: {entry['sql']} params={entry['params']}"
+    )
+    with _lock:
+        _entries.append(entry)
+
+
+def get_entries():
+    """Get buffered slow-query entries, newest first."""
+    with _lock:
+        return [dict(entry) for entry in reversed(_entries)]
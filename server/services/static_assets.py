@@ -0,0 +1,131 @@
+"""
+Precomputed manifest of the exported client build (client/out).
+Built once at startup: every file's size, strong ETag, content type and
+compressed variants are known up front, and small files are held in memory,
+so serving a static asset or SPA route costs no filesystem calls per request.
+Variants missing from the build are compressed at startup with fast settings;
+ship .br/.gz files next to the originals to serve maximum compression instead.
+
+Environment:
+    STATIC_BR_QUALITY   brotli quality 0-11 for startup compression (default 5)
+    STATIC_GZIP_LEVEL   gzip level 1-9 for startup compression (default 6)
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from flask import Response, request, send_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Files at or below this size are kept in memory (and compressed there if needed)
+MAX_IN_MEMORY_BYTES = 1024 * 1024
+MIN_COMPRESS_BYTES = 1024
+# Every worker compresses the build at startup, so keep this well below the maximum
+BR_QUALITY = int(os.environ.get("STATIC_BR_QUALITY", 5))
+GZIP_LEVEL = int(os.environ.get("STATIC_GZIP_LEVEL", 6))
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "image/svg+xml",
+    "application/manifest+json", "application/xml",
+)
+
+# Next.js emits content-hashed filenames under _next/static, so they never change
+IMMUTABLE_PREFIX = "_next/static/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+class StaticAsset:
+    """One servable file: identity bytes plus optional br/gzip variants."""
+
+    __slots__ = ("path", "mimetype", "etag", "size", "body", "variants", "cache_control")
+
+    def __init__(self, rel_path, abs_path, sibling_variants):
+        self.path = abs_path
+        self.mimetype = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+        self.cache_control = (
+            IMMUTABLE_CACHE_CONTROL if rel_path.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE_CONTROL
+        )
+
+        with open(abs_path, "rb") as f:
+            content = f.read()
+        self.size = len(content)
+        self.etag = hashlib.sha1(content).hexdigest()
+        self.body = content if self.size <= MAX_IN_MEMORY_BYTES else None
+
+        # encoding -> bytes; precompressed files from the build win over compressing here
+        self.variants = {}
+        for encoding, variant_path in sibling_variants.items():
+            with open(variant_path, "rb") as f:
+                self.variants[encoding] = f.read()
+        compressible = self.mimetype.startswith(COMPRESSIBLE_TYPES)
+        if self.body is not None and compressible and self.size >= MIN_COMPRESS_BYTES:
+            if "gzip" not in self.variants:
+                self.variants["gzip"] = gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+            if "br" not in self.variants and brotli is not None:
+                self.variants["br"] = brotli.compress(content, quality=BR_QUALITY)
+        # Drop variants that don't actually save bytes
+        self.variants = {e: b for e, b in self.variants.items() if len(b) < self.size}
+
+
+def build_manifest(root):
+    """Map every exported file's URL path (posix, relative to `root`) to its StaticAsset."""
+    manifest = {}
+    if not os.path.isdir(root):
+        return manifest
+
+    for dirpath, _, filenames in os.walk(root):
+        names = set(filenames)
+        for name in filenames:
+            if name.endswith((".gz", ".br")) and name[:-3] in names:
+                continue
+            abs_path = os.path.join(dirpath, name)
+            rel_path = os.path.relpath(abs_path, root).replace(os.sep, "/")
+            siblings = {
+                encoding: os.path.join(dirpath, f"{name}{suffix}")
+                for encoding, suffix in (("br", ".br"), ("gzip", ".gz"))
+                if f"{name}{suffix}" in names
+            }
+            manifest[rel_path] = StaticAsset(rel_path, abs_path, siblings)
+    return manifest
+
+
+def resolve(manifest, path):
+    """
+    Find the asset for a request path: the exact file, then the route's
+    index.html (trailingSlash export), then the root index.html for client routing.
+    """
+    clean_path = path.replace("\\", "/").strip("/")
+    if clean_path in manifest:
+        return manifest[clean_path]
+    index_path = f"{clean_path}/index.html" if clean_path else "index.html"
+    return manifest.get(index_path) or manifest.get("index.html")
+
+
+def serve(asset):
+    """Build the response for an asset, honouring If-None-Match and Accept-Encoding."""
+    encoding = None
+    for candidate in ("br", "gzip"):
+        if candidate in asset.variants and request.accept_encodings[candidate]:
+            encoding = candidate
+            break
+    etag = f"{asset.etag}-{encoding}" if encoding else asset.etag
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif encoding:
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        response.headers["Content-Encoding"] = encoding
+    elif asset.body is not None:
+        response = Response(asset.body, mimetype=asset.mimetype)
+    else:
+        response = send_file(asset.path, mimetype=asset.mimetype, etag=False, conditional=False)
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = asset.cache_control
+    if asset.variants:
+        response.vary.add("Accept-Encoding")
+    return response
@@ -0,0 +1,103 @@
+from flask import current_app, request, Response
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+_END = object()
+
+
+def wants_stream():
+    """
+    Check whether the client asked for a streamed list response,
+    either with `Accept: application/x-ndjson` or `?stream=1`.
+    """
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    return NDJSON_MIMETYPE in request.headers.get("Accept", "")
+
+
+def wants_columnar():
+    """
+    Check whether the client asked for the columnar list format (`?format=columnar`):
+    column names sent once, followed by one array of values per row.
+    """
+    return request.args.get("format") == "columnar"
+
+
+def stream_response(rows):
+    """
+    Build a streaming response from an iterable of dicts.
+    Sends NDJSON (one object per line) when the client accepts it,
+    otherwise a regular JSON array written element by element.
+    The first row is fetched before returning, so pool checkout and query
+    errors raise in the calling route instead of truncating a 200 body.
+    """
+    # Bound here because the generators run after the app context is gone
+    dumps = current_app.json.dumps
+
+    rows = _primed(rows)
+
+    if NDJSON_MIMETYPE in request.headers.get("Accept", ""):
+        def generate_ndjson():
+            for row in rows:
+                yield dumps(row) + "\n"
+        return Response(_closing(generate_ndjson(), rows), mimetype=NDJSON_MIMETYPE)
+
+    def generate_json():
+        yield "["
+        first = True
+        for row in rows:
+            yield dumps(row) if first else "," + dumps(row)
+            first = False
+        yield "]"
+    return Response(_closing(generate_json(), rows), mimetype="application/json")
+
+
+def _closing(body, rows):
+    """
+    Wrap a response body generator so closing the response also closes `rows`.
+    A generator closed before its first item never runs its own cleanup.
+    """
+    def close():
+        body.close()
+        rows.close()
+    return _ClosingIterator(body, close)
+
+
+def _primed(rows):
+    """
+    Start `rows` up to its first item now and return an iterator that replays
+    that item before the rest. Closing the returned iterator closes `rows`,
+    releasing a pooled connection held by a server-side cursor, even if
+    iteration never started (e.g. the client went away before the body).
+    """
+    rows = iter(rows)
+    first = next(rows, _END)
+
+    def replay():
+        if first is not _END:
+            yield first
+            yield from rows
+
+    replayed = replay()
+
+    def close():
+        replayed.close()
+        close_rows = getattr(rows, "close", None)
+        if close_rows is not None:
+            close_rows()
+
+    return _ClosingIterator(replayed, close)
+
+
+class _ClosingIterator:
+    """Iterator over `iterator` whose close() runs `close` whether or not it was started."""
+
+    def __init__(self, iterator, close):
+        self._iterator = iterator
+        self.close = close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
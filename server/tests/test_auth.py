@@ -0,0 +1,76 @@
+import time
+import jwt
+import pytest
+from services import auth
+
+SECRET = "test-secret-at-least-32-bytes-long"
+
+
+@pytest.fixture(autouse=True)
+def shared_secret(monkeypatch):
+    monkeypatch.setattr(auth, "JWT_SECRET", SECRET)
+    auth._verified_tokens.clear()
+    yield
+    auth._verified_tokens.clear()
+
+
+def make_token(secret=SECRET, expires_in=3600, **claims):
+    payload = {
+        "sub": "user-1",
+        "email": "user@example.com",
+        "aud": auth.JWT_AUDIENCE,
+        "exp": int(time.time()) + expires_in,
+        **claims,
+    }
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+def test_valid_token_returns_user():
+    assert auth.verify_token(make_token()) == {"email": "user@example.com", "id": "user-1"}
+
+
+def test_bad_signature_is_rejected():
+    assert auth.verify_token(make_token(secret="other-secret-at-least-32-bytes-long")) is None
+
+
+def test_expired_token_is_rejected():
+    assert auth.verify_token(make_token(expires_in=-60)) is None
+
+
+def test_wrong_audience_is_rejected():
+    assert auth.verify_token(make_token(aud="anon")) is None
+
+
+def test_token_without_email_is_rejected():
+    assert auth.verify_token(make_token(email=None)) is None
+
+
+def test_repeat_token_is_served_from_cache(monkeypatch):
+    calls = []
+    decode = auth._decode_token
+    monkeypatch.setattr(auth, "_decode_token", lambda token: calls.append(token) or decode(token))
+    token = make_token()
+
+    first = auth.verify_token(token)
+    assert auth.verify_token(token) == first
+    assert len(calls) == 1
+
+
+def test_cached_token_is_reverified_after_expiry(monkeypatch):
+    calls = []
+    decode = auth._decode_token
+    monkeypatch.setattr(auth, "_decode_token", lambda token: calls.append(token) or decode(token))
+    token = make_token(expires_in=60)
+    auth.verify_token(token)
+
+    later = time.time() + 120
+    monkeypatch.setattr(auth.time, "time", lambda: later)
+    auth.verify_token(token)
+    assert len(calls) == 2
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_CACHE_SIZE", 2)
+    for index in range(3):
+        auth.verify_token(make_token(sub=f"user-{index}"))
+    assert len(auth._verified_tokens) == 2
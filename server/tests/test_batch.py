@@ -0,0 +1,115 @@
+import pytest
+from services import batch
+
+FIELDS = ("firstName", "lastName", "year")
+TYPES = {"year": int}
+
+
+def test_partial_records_use_fields_of_first_record():
+    fields, rows = batch.prepare_records(
+        [{"idNo": "1", "year": 2}, {"idNo": "2", "year": 3}], "idNo", FIELDS, field_types=TYPES
+    )
+    assert fields == ("year",)
+    assert rows == [("1", 2), ("2", 3)]
+
+
+def test_full_records_fill_absent_fields_with_none():
+    fields, rows = batch.prepare_records(
+        [{"idNo": "1", "firstName": "Ana"}], "idNo", FIELDS, partial=False
+    )
+    assert fields == FIELDS
+    assert rows == [("1", "Ana", None, None)]
+
+
+@pytest.mark.parametrize("records, message", [
+    ([], "No records provided"),
+    ({"idNo": "1"}, "No records provided"),
+    ([{"idNo": "1"}], "at least one of"),
+    ([{"year": 1}], "missing 'idNo'"),
+    ([{"idNo": "", "year": 1}], "missing 'idNo'"),
+    ([{"idNo": 5, "year": 1}], "invalid 'idNo'"),
+    ([{"idNo": ["1"], "year": 1}], "invalid 'idNo'"),
+    ([{"idNo": "1", "year": 1}, {"idNo": "2", "lastName": "Cruz"}], "same fields"),
+    ([{"idNo": "1", "year": 1}, {"idNo": "1", "year": 2}], "Duplicate 'idNo'"),
+])
+def test_invalid_records_are_rejected(records, message):
+    with pytest.raises(ValueError, match=message):
+        batch.prepare_records(records, "idNo", FIELDS, field_types=TYPES)
+
+
+def test_required_fields_must_be_present():
+    with pytest.raises(ValueError, match="Record 0 is missing 'lastName'"):
+        batch.prepare_records([{"idNo": "1", "firstName": "Ana"}], "idNo", FIELDS,
+                              required_fields=("lastName",), partial=False)
+
+
+def test_batch_size_is_bounded(monkeypatch):
+    monkeypatch.setattr(batch, "MAX_BATCH_SIZE", 2)
+    with pytest.raises(ValueError, match="At most 2 records"):
+        batch.prepare_records([{"idNo": str(i), "year": 1} for i in range(3)], "idNo", FIELDS, field_types=TYPES)
+
+
+def test_build_results_keeps_input_order():
+    rows = [("1", 2), ("2", 3), ("3", 4)]
+    written = [{"idNo": "3", "inserted": True}, {"idNo": "1", "inserted": False}]
+
+    assert batch.build_results(rows, written, "idNo") == {
+        "results": [
+            {"idNo": "1", "status": "updated"},
+            {"idNo": "2", "status": "not_found"},
+            {"idNo": "3", "status": "inserted"},
+        ],
+        "inserted": 1,
+        "updated": 1,
+        "not_found": 1,
+    }
+
+
+def test_prepare_keys_deduplicates_in_order():
+    assert batch.prepare_keys(["b", "a", "b"], "codes") == ["b", "a"]
+
+
+@pytest.mark.parametrize("keys", [[], "a", ["a", ""], ["a", 1]])
+def test_prepare_keys_rejects_invalid_input(keys):
+    with pytest.raises(ValueError):
+        batch.prepare_keys(keys, "codes")
+
+
+def test_order_by_keys_reports_missing():
+    found = [{"code": "a"}, {"code": "b"}]
+    assert batch.order_by_keys(["b", "x", "a", "b"], found, "code") == {
+        "results": [{"code": "b"}, {"code": "a"}, {"code": "b"}],
+        "missing": ["x"],
+    }
+
+
+@pytest.mark.parametrize("value", ["abc", 2.5, True, [2], {"n": 2}, 2 ** 31])
+def test_wrongly_typed_int_value_is_rejected(value):
+    records = [{"idNo": "1", "year": 1}, {"idNo": "2", "year": value}]
+    with pytest.raises(ValueError, match=r"Record 1 \(2\) has an invalid 'year'"):
+        batch.prepare_records(records, "idNo", FIELDS, field_types=TYPES)
+
+
+@pytest.mark.parametrize("value", [3, {"a": 1}, ["Ana"]])
+def test_wrongly_typed_text_value_is_rejected(value):
+    with pytest.raises(ValueError, match=r"Record 0 \(1\) has an invalid 'firstName'"):
+        batch.prepare_records([{"idNo": "1", "firstName": value}], "idNo", FIELDS)
+
+
+def test_null_values_are_allowed():
+    _, rows = batch.prepare_records(
+        [{"idNo": "1", "firstName": None, "year": None}], "idNo", FIELDS, field_types=TYPES
+    )
+    assert rows == [("1", None, None)]
+
+
+def test_body_field_reads_json_objects():
+    assert batch.body_field({"records": [1]}, "records") == [1]
+    assert batch.body_field({}, "records") is None
+    assert batch.body_field(None, "records") is None
+
+
+@pytest.mark.parametrize("data", [[{"idNo": "1"}], "records", 3])
+def test_body_field_rejects_non_objects(data):
+    with pytest.raises(ValueError, match="JSON object"):
+        batch.body_field(data, "records")
@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+import psycopg2
+import pytest
+from services.business import batch_service
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """Replace the transaction and the per-entity services; calls are recorded in order."""
+    calls = []
+
+    @contextmanager
+    def transaction():
+        calls.append("begin")
+        try:
+            yield
+        except Exception:
+            calls.append("rollback")
+            raise
+        calls.append("commit")
+
+    monkeypatch.setattr(batch_service, "transaction", transaction)
+    monkeypatch.setattr(batch_service, "_create", lambda entity, data: calls.append(("create", entity)) or data)
+    monkeypatch.setattr(batch_service, "_update", lambda entity, key, data: calls.append(("update", key)) or data)
+    monkeypatch.setattr(batch_service, "_delete", lambda entity, key: calls.append(("delete", key)) or None)
+    for service in (batch_service.college_service, batch_service.program_service):
+        monkeypatch.setattr(service, "invalidate_cache", lambda: None)
+    return calls
+
+
+@pytest.mark.parametrize("operations, message", [
+    (None, "No operations"),
+    ([], "No operations"),
+    (["create"], "Operation 0 must be an object"),
+    ([{"op": "upsert", "entity": "college"}], "invalid op"),
+    ([{"op": "create", "entity": "user", "data": {}}], "invalid entity"),
+    ([{"op": "create", "entity": "college"}], "missing 'data'"),
+    ([{"op": "delete", "entity": "college"}], "missing 'key'"),
+    ([{"op": "delete", "entity": "college", "key": 5}], "Operation 0 has an invalid 'key'"),
+    ([{"op": "update", "entity": "student", "key": {"idNo": "1"}, "data": {}}], "invalid 'key'"),
+])
+def test_invalid_operations_are_rejected_before_the_transaction(services, operations, message):
+    with pytest.raises(ValueError, match=message):
+        batch_service.run(operations)
+    assert services == []
+
+
+def test_operations_run_in_order_in_one_transaction(services):
+    result = batch_service.run([
+        {"op": "create", "entity": "college", "data": {"code": "CCS"}},
+        {"op": "update", "entity": "program", "key": "BSCS", "data": {"code": "BSCS"}},
+    ])
+
+    assert services == ["begin", ("create", "college"), ("update", "BSCS"), "commit"]
+    assert [r["index"] for r in result["results"]] == [0, 1]
+
+
+def test_missing_row_rolls_everything_back(services):
+    with pytest.raises(ValueError, match=r"Operation 1 \(delete student\): 2024-0001 not found"):
+        batch_service.run([
+            {"op": "create", "entity": "college", "data": {"code": "CCS"}},
+            {"op": "delete", "entity": "student", "key": "2024-0001"},
+        ])
+    assert services[-1] == "rollback"
+
+
+def test_constraint_violation_names_the_operation(services, monkeypatch):
+    def create(entity, data):
+        raise psycopg2.IntegrityError("duplicate key")
+
+    monkeypatch.setattr(batch_service, "_create", create)
+    with pytest.raises(ValueError, match=r"Operation 0 \(create college\) failed: duplicate key"):
+        batch_service.run([{"op": "create", "entity": "college", "data": {"code": "CCS"}}])
@@ -0,0 +1,61 @@
+import pytest
+from services.business import metrics_service
+
+# GROUPING(college_code, course, year, gender) sets the bit of every aggregated
+# column, most significant first: 15 is the total row, 7 grouped college_code only
+BREAKDOWN_ROWS = [
+    {"college_code": None, "course": None, "year": None, "gender": None, "grouping_mask": 15, "count": 8},
+    {"college_code": "CCS", "course": None, "year": None, "gender": None, "grouping_mask": 7, "count": 7},
+    {"college_code": None, "course": "BSCS", "year": None, "gender": None, "grouping_mask": 11, "count": 7},
+    {"college_code": None, "course": None, "year": 1, "gender": None, "grouping_mask": 13, "count": 5},
+    {"college_code": None, "course": None, "year": None, "gender": "F", "grouping_mask": 14, "count": 4},
+    {"college_code": None, "course": None, "year": None, "gender": "M", "grouping_mask": 14, "count": 4},
+    {"college_code": None, "course": None, "year": 2, "gender": None, "grouping_mask": 13, "count": 3},
+    # Students without a college: grouped, but the value itself is NULL
+    {"college_code": None, "course": None, "year": None, "gender": None, "grouping_mask": 7, "count": 1},
+]
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    calls = []
+
+    def get_breakdown(dimensions):
+        calls.append(dimensions)
+        if dimensions == ("year",):
+            return [{"year": None, "grouping_mask": 1, "count": 8}, {"year": 1, "grouping_mask": 0, "count": 8}]
+        return BREAKDOWN_ROWS
+
+    monkeypatch.setattr(metrics_service.metrics_repository, "get_breakdown", get_breakdown)
+    return calls
+
+
+def test_rows_are_grouped_by_their_mask(queries):
+    result = metrics_service._load_breakdown(metrics_service.BREAKDOWN_DIMENSIONS)
+
+    assert result == {
+        "total": 8,
+        "college_code": [{"value": "CCS", "count": 7}, {"value": None, "count": 1}],
+        "course": [{"value": "BSCS", "count": 7}],
+        "year": [{"value": 1, "count": 5}, {"value": 2, "count": 3}],
+        "gender": [{"value": "F", "count": 4}, {"value": "M", "count": 4}],
+    }
+
+
+def test_single_dimension(queries):
+    assert metrics_service._load_breakdown(("year",)) == {"total": 8, "year": [{"value": 1, "count": 8}]}
+
+
+def test_requested_dimensions_are_canonicalized(queries, monkeypatch):
+    monkeypatch.setattr(metrics_service, "_breakdown_cache",
+                        type("NoCache", (), {"get": staticmethod(lambda dimensions: queries.append(dimensions))})())
+    metrics_service.get_breakdown(" gender,college_code ")
+    metrics_service.get_breakdown(None)
+
+    assert queries == [("college_code", "gender"), metrics_service.BREAKDOWN_DIMENSIONS]
+
+
+def test_unknown_dimension_is_rejected(queries):
+    with pytest.raises(ValueError, match="Invalid breakdown dimension: name"):
+        metrics_service.get_breakdown("year,name")
+    assert queries == []
@@ -0,0 +1,139 @@
+from flask import Flask, g
+import pytest
+from services import cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    monkeypatch.setattr(cache, "_checked_versions", {})
+    monkeypatch.setattr(cache, "VERSION_CHECK_INTERVAL", 1.0)
+    return clock
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    """Current table versions; every lookup is recorded in `versions.lookups`."""
+    class Versions(dict):
+        lookups = 0
+
+    current = Versions(colleges=1)
+
+    def get_versions(tables):
+        current.lookups += 1
+        return {t: current[t] for t in tables if t in current}
+
+    monkeypatch.setattr(cache.version_repository, "get_versions", get_versions)
+    return current
+
+
+@pytest.fixture
+def loads():
+    return []
+
+
+@pytest.fixture
+def snapshot(monkeypatch, loads):
+    monkeypatch.setattr(cache, "_caches", [])
+
+    def load():
+        loads.append(1)
+        return [{"code": "CCS", "name": f"load {len(loads)}"}]
+
+    return cache.SnapshotCache("colleges", load, key="code", table_names=("colleges",), ttl=60)
+
+
+def test_reads_within_interval_skip_version_lookup(clock, versions, snapshot, loads):
+    assert snapshot.get("CCS")["name"] == "load 1"
+    clock.now += 0.5
+    assert snapshot.get_all() == [{"code": "CCS", "name": "load 1"}]
+    assert snapshot.get_many(["CCS", "CEBA"]) == [{"code": "CCS", "name": "load 1"}, None]
+
+    assert versions.lookups == 1
+    assert len(loads) == 1
+    assert snapshot.stats()["hits"] == 2
+
+
+def test_unchanged_versions_keep_snapshot(clock, versions, snapshot, loads):
+    snapshot.get("CCS")
+    clock.now += 5
+    snapshot.get("CCS")
+
+    assert versions.lookups == 2
+    assert len(loads) == 1
+
+
+def test_version_bump_reloads_after_interval(clock, versions, snapshot, loads):
+    snapshot.get("CCS")
+    versions["colleges"] = 2
+
+    clock.now += 0.5
+    assert snapshot.get("CCS")["name"] == "load 1"
+    clock.now += 1
+    assert snapshot.get("CCS")["name"] == "load 2"
+    assert snapshot.stats()["evictions"] == 1
+
+
+def test_invalidate_reloads_immediately(clock, versions, snapshot, loads):
+    snapshot.get("CCS")
+    snapshot.invalidate()
+
+    assert snapshot.get("CCS")["name"] == "load 2"
+    assert versions.lookups == 1
+
+
+def test_without_counters_snapshot_expires_after_ttl(clock, versions, snapshot, loads):
+    versions.clear()
+    snapshot.get("CCS")
+    clock.now += 30
+    snapshot.get("CCS")
+    assert len(loads) == 1
+
+    clock.now += 31
+    snapshot.get("CCS")
+    assert len(loads) == 2
+
+
+def test_request_versions_are_reused(clock, versions, snapshot, loads):
+    with Flask(__name__).test_request_context():
+        g.table_versions = {"colleges": 1}
+        snapshot.get("CCS")
+        g.table_versions = {"colleges": 2}
+        assert snapshot.get("CCS")["name"] == "load 2"
+
+    assert versions.lookups == 0
+
+
+def test_versioned_cache_keys_results_by_arguments(clock, versions, monkeypatch):
+    monkeypatch.setattr(cache, "_caches", [])
+    calls = []
+    counts = cache.VersionedCache("counts", lambda *args: calls.append(args) or len(calls), ("colleges",))
+
+    assert counts.get("a") == 1
+    assert counts.get("b") == 2
+    assert counts.get("a") == 1
+
+    versions["colleges"] = 2
+    clock.now += 2
+    assert counts.get("a") == 3
+    assert versions.lookups == 2
+
+
+def test_versioned_cache_bypassed_without_counters(clock, versions, monkeypatch):
+    monkeypatch.setattr(cache, "_caches", [])
+    versions.clear()
+    calls = []
+    counts = cache.VersionedCache("counts", lambda: calls.append(1), ("colleges",))
+
+    counts.get()
+    counts.get()
+    assert len(calls) == 2
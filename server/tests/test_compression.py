@@ -0,0 +1,70 @@
+import gzip
+from flask import Flask, Response, jsonify
+import pytest
+from services import compression
+
+LARGE = [{"name": "x" * 100} for _ in range(50)]
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route("/api/large")
+    def large():
+        response = jsonify(LARGE)
+        response.set_etag("abc")
+        return response
+
+    @app.route("/api/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/api/image")
+    def image():
+        return Response(b"\0" * 4096, mimetype="image/png")
+
+    @app.route("/large")
+    def outside_api():
+        return jsonify(LARGE)
+
+    app.after_request(compression.compress_response)
+    return app.test_client()
+
+
+def test_gzip_when_accepted(client, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    response = client.get("/api/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] == '"abc-gzip"'
+    assert gzip.decompress(response.data).startswith(b"[")
+
+
+def test_brotli_preferred_when_available(client):
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/api/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.headers["ETag"] == '"abc-br"'
+    assert brotli.decompress(response.data).startswith(b"[")
+
+
+def test_brotli_skipped_when_not_accepted(client):
+    response = client.get("/api/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_identity_when_nothing_accepted(client):
+    response = client.get("/api/large", headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] == '"abc"'
+
+
+@pytest.mark.parametrize("path", ["/api/small", "/api/image", "/large"])
+def test_ineligible_responses_are_left_alone(client, path):
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
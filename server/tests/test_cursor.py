@@ -0,0 +1,57 @@
+import pytest
+from services.business import student_service
+
+SCOPE = {"sort": "lastName", "order": "asc", "filters": {"year": 2}}
+
+
+def test_cursor_round_trip():
+    token = student_service._encode_cursor({"sort_key": "Cruz", "idNo": "2024-0001"}, SCOPE)
+
+    assert "=" not in token
+    assert student_service._decode_cursor(token, SCOPE) == ("Cruz", "2024-0001")
+
+
+@pytest.mark.parametrize("scope", [
+    {**SCOPE, "sort": "firstName"},
+    {**SCOPE, "order": "desc"},
+    {**SCOPE, "filters": {"year": 3}},
+])
+def test_cursor_from_another_scope_is_rejected(scope):
+    token = student_service._encode_cursor({"sort_key": "Cruz", "idNo": "2024-0001"}, SCOPE)
+
+    with pytest.raises(ValueError, match="does not match"):
+        student_service._decode_cursor(token, scope)
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor", "", "WzFd", "eyJwb3NpdGlvbiI6IFsxXX0"])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        student_service._decode_cursor(token, SCOPE)
+
+
+def test_non_numeric_year_filter_is_rejected():
+    with pytest.raises(ValueError, match="Invalid year"):
+        student_service.get_page(filters={"year": "abc"})
+
+
+@pytest.mark.parametrize("sort, position", [
+    ("year", ["abc", "2024-0001"]),
+    ("year", [True, "2024-0001"]),
+    ("year", [2.5, "2024-0001"]),
+    ("lastName", [3, "2024-0001"]),
+    ("lastName", [{"a": 1}, "2024-0001"]),
+    ("idNo", ["2024-0001", 7]),
+    ("course", ["BSCS", None]),
+])
+def test_cursor_with_wrongly_typed_position_is_rejected(sort, position):
+    scope = {**SCOPE, "sort": sort}
+    token = student_service._encode_cursor({"sort_key": position[0], "idNo": position[1]}, scope)
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        student_service._decode_cursor(token, scope)
+
+
+def test_year_cursor_round_trip():
+    scope = {**SCOPE, "sort": "year"}
+    token = student_service._encode_cursor({"sort_key": 3, "idNo": "2024-0001"}, scope)
+    assert student_service._decode_cursor(token, scope) == (3, "2024-0001")
@@ -0,0 +1,94 @@
+from flask import Flask, jsonify
+import pytest
+from services import http_cache
+from services.compression import compress_response
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    current = {"colleges": 1, "students": 7}
+    monkeypatch.setattr(
+        http_cache.version_repository, "get_versions",
+        lambda tables: {t: current[t] for t in tables if t in current},
+    )
+    return current
+
+
+@pytest.fixture
+def client(versions):
+    app = Flask(__name__)
+    app.calls = 0
+
+    @app.route("/api/colleges")
+    @http_cache.conditional("colleges", include_tables={"counts": ("students",)})
+    def colleges():
+        app.calls += 1
+        return jsonify([{"code": "CCS", "name": "x" * 2000}])
+
+    @app.route("/api/programs")
+    @http_cache.conditional("programs")
+    def programs():
+        app.calls += 1
+        return jsonify([])
+
+    app.after_request(compress_response)
+    test_client = app.test_client()
+    test_client.app = app
+    return test_client
+
+
+def test_matching_etag_returns_304_without_running_route(client):
+    etag = client.get("/api/colleges").headers["ETag"]
+
+    response = client.get("/api/colleges", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert client.app.calls == 1
+
+
+def test_compressed_etag_also_matches(client):
+    etag = client.get("/api/colleges", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    assert etag.endswith('-gzip"')
+
+    response = client.get("/api/colleges", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+    assert response.status_code == 304
+    assert client.app.calls == 1
+
+
+def test_version_bump_changes_etag(client, versions):
+    etag = client.get("/api/colleges").headers["ETag"]
+    versions["colleges"] += 1
+
+    response = client.get("/api/colleges", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_included_tables_are_part_of_etag(client, versions):
+    etag = client.get("/api/colleges?include=counts").headers["ETag"]
+    versions["students"] += 1
+
+    response = client.get("/api/colleges?include=counts", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_table_without_counter_is_not_cached(client):
+    response = client.get("/api/programs")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_responses_vary_on_accept(client):
+    response = client.get("/api/colleges", headers={"Accept-Encoding": "gzip"})
+    vary = {v.strip() for v in response.headers["Vary"].split(",")}
+    assert {"Accept", "Accept-Encoding"} <= vary
+
+    response = client.get("/api/colleges", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert "Accept" in response.headers["Vary"]
+
+
+def test_accept_header_is_part_of_etag(client):
+    plain = client.get("/api/colleges").headers["ETag"]
+    ndjson = client.get("/api/colleges", headers={"Accept": "application/x-ndjson"}).headers["ETag"]
+    assert plain != ndjson
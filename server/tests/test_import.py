@@ -0,0 +1,175 @@
+import io
+import json
+from contextlib import contextmanager
+import pytest
+from repositories import student_repository
+from services import database
+from services.business import student_service
+
+
+@pytest.fixture
+def imported(monkeypatch):
+    """Replace the staging load; the rows it received are kept in the returned list."""
+    received = []
+
+    def import_rows(rows, upsert=False):
+        received.extend(rows)
+        return [{"idNo": row[1], "inserted": True} for row in received], []
+
+    monkeypatch.setattr(student_repository, "import_rows", import_rows)
+    return received
+
+
+def csv_upload(text):
+    return io.BytesIO(text.encode())
+
+
+def ndjson_upload(*lines):
+    return io.BytesIO("\n".join(lines).encode())
+
+
+def test_csv_rows_become_staging_tuples(imported):
+    result = student_service.import_students(csv_upload(
+        "idNo,firstName,lastName,course,year\n"
+        "2024-0001, Ana ,Cruz,BSCS,2\n"
+        "2024-0002,Ben,Reyes,,\n"
+    ))
+
+    assert imported == [
+        (2, "2024-0001", "Ana", "Cruz", "BSCS", "2", None, None),
+        (3, "2024-0002", "Ben", "Reyes", None, None, None, None),
+    ]
+    assert result == {"inserted": 2, "updated": 0, "failed": 0, "errors": []}
+
+
+def test_csv_byte_order_mark_is_ignored(imported):
+    student_service.import_students(io.BytesIO("﻿idNo,firstName,lastName\n1,Ana,Cruz\n".encode()))
+    assert imported[0][1] == "1"
+
+
+def test_csv_header_must_name_required_columns(imported):
+    with pytest.raises(ValueError, match="firstName, lastName"):
+        student_service.import_students(csv_upload("idNo,name\n1,Ana\n"))
+
+
+def test_empty_upload_is_rejected(imported):
+    with pytest.raises(ValueError, match="No rows"):
+        student_service.import_students(csv_upload("idNo,firstName,lastName\n"))
+
+
+def test_unsupported_format_is_rejected(imported):
+    with pytest.raises(ValueError, match="Unsupported"):
+        student_service.import_students(csv_upload(""), fmt="xlsx")
+
+
+def test_malformed_csv_row_is_reported(imported):
+    # A field over csv.field_size_limit() (128 KiB by default) raises csv.Error
+    result = student_service.import_students(csv_upload(
+        "idNo,firstName,lastName\n"
+        "1,Ana,Cruz\n"
+        '2,"' + "x" * 200000 + '",Reyes\n'
+        "3,Carl,Santos\n"
+    ))
+
+    assert [row[1] for row in imported] == ["1", "3"]
+    assert result["failed"] == 1
+    assert result["errors"][0]["line"] == 3
+    assert result["errors"][0]["error"].startswith("Malformed CSV row")
+
+
+def test_ndjson_bad_lines_are_reported(imported):
+    result = student_service.import_students(ndjson_upload(
+        json.dumps({"idNo": "1", "firstName": "Ana", "lastName": "Cruz", "year": 2}),
+        "{not json",
+        "",
+        "[1, 2]",
+        json.dumps({"idNo": "2", "firstName": "Ben\x00", "lastName": "Reyes"}),
+    ), fmt="ndjson")
+
+    assert imported == [(1, "1", "Ana", "Cruz", None, 2, None, None)]
+    assert result["errors"] == [
+        {"line": 2, "idNo": None, "error": "Invalid JSON"},
+        {"line": 4, "idNo": None, "error": "Expected a JSON object"},
+        {"line": 5, "idNo": None, "error": "Invalid NUL character"},
+    ]
+
+
+def test_rejected_rows_are_merged_in_line_order(monkeypatch):
+    def import_rows(rows, upsert=False):
+        rows = list(rows)
+        return [{"idNo": "1", "inserted": False}], [{"line": 1, "idNo": "2", "error": "Unknown course"}]
+
+    monkeypatch.setattr(student_repository, "import_rows", import_rows)
+    result = student_service.import_students(ndjson_upload(
+        json.dumps({"idNo": "2", "firstName": "Ben", "lastName": "Reyes", "course": "X"}),
+        "{",
+        json.dumps({"idNo": "1", "firstName": "Ana", "lastName": "Cruz"}),
+    ), fmt="ndjson", upsert=True)
+
+    assert result["updated"] == 1
+    assert [e["line"] for e in result["errors"]] == [1, 2]
+
+
+def test_upload_is_spooled_before_connection_checkout(monkeypatch):
+    consumed = []
+
+    def rows():
+        yield (1, "1", "Ana", "Cruz", None, None, None, None)
+        consumed.append(True)
+
+    @contextmanager
+    def get_db_cursor():
+        assert consumed, "connection checked out while the upload was still being read"
+        raise RuntimeError("stop")
+        yield
+
+    monkeypatch.setattr(student_repository, "get_db_cursor", get_db_cursor)
+    with pytest.raises(RuntimeError, match="stop"):
+        student_repository.import_rows(rows())
+
+
+def test_spool_rows_writes_none_as_unquoted_empty_field():
+    with database.spool_rows([(1, "a,b", None, 'say "hi"')]) as buffer:
+        assert buffer.read() == '1,"a,b",,"say ""hi"""\n'
+
+
+class RecordingCursor:
+    class connection:
+        encoding = "UTF8"
+
+    def __init__(self):
+        self.copied = None
+        self.statements = []
+
+    def copy_expert(self, sql, buffer):
+        self.copied = (sql, buffer.read())
+
+    def mogrify(self, sql, params):
+        return repr(params).encode()
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql if isinstance(sql, str) else sql.decode())
+
+
+def test_copy_rows_uses_copy_without_wait_callback(monkeypatch):
+    monkeypatch.setattr(database, "_wait_callback", None)
+    cur = RecordingCursor()
+    with database.spool_rows([(1, "a", None)]) as buffer:
+        database.copy_rows(cur, "staging", ("line", "idNo", "name"), buffer)
+
+    assert cur.copied == ('COPY staging ("line", "idNo", "name") FROM STDIN WITH (FORMAT csv)', "1,a,\n")
+    assert cur.statements == []
+
+
+def test_copy_rows_inserts_in_pages_under_wait_callback(monkeypatch):
+    monkeypatch.setattr(database, "_wait_callback", lambda conn, timeout=None: None)
+    monkeypatch.setattr(database, "COPY_INSERT_PAGE_SIZE", 2)
+    cur = RecordingCursor()
+    with database.spool_rows([(1, "a", None), (2, "b", "x"), (3, "c", "")]) as buffer:
+        database.copy_rows(cur, "staging", ("line", "idNo", "name"), buffer)
+
+    assert cur.copied is None
+    assert len(cur.statements) == 2
+    assert cur.statements[0].startswith('INSERT INTO staging ("line", "idNo", "name") VALUES ')
+    assert "['1', 'a', None]" in cur.statements[0]
+    assert "['3', 'c', None]" in cur.statements[1]
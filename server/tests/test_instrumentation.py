@@ -0,0 +1,97 @@
+from collections import defaultdict
+from flask import Flask, jsonify
+import pytest
+from services import instrumentation
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A small app wired like app.py, with fresh metric stores."""
+    monkeypatch.setattr(instrumentation, "_latency_buckets",
+                        defaultdict(lambda: [0] * (len(instrumentation.LATENCY_BUCKETS) + 1)))
+    for name in ("_latency_sum", "_db_seconds", "_pool_wait_seconds"):
+        monkeypatch.setattr(instrumentation, name, defaultdict(float))
+    for name in ("_status_counts", "_response_bytes", "_db_queries"):
+        monkeypatch.setattr(instrumentation, name, defaultdict(int))
+
+    app = Flask(__name__)
+    app.before_request(instrumentation.start_request)
+    app.after_request(instrumentation.finish_request)
+
+    @app.route("/api/items")
+    def items():
+        instrumentation.record_pool_wait(0.25)
+        instrumentation.record_query(0.5)
+        instrumentation.record_query(0.25)
+        return jsonify([1, 2, 3])
+
+    @app.route("/api/missing")
+    def missing():
+        return jsonify({"error": "not found"}), 404
+
+    return app.test_client()
+
+
+def metric_lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name + "{") or line.startswith(name + " ")]
+
+
+def test_histogram_has_cumulative_buckets(client):
+    client.get("/api/items")
+    client.get("/api/items")
+    text = instrumentation.render_prometheus()
+
+    buckets = metric_lines(text, "http_request_duration_seconds_bucket")
+    assert len(buckets) == len(instrumentation.LATENCY_BUCKETS) + 1
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)
+    assert buckets[-1] == (
+        'http_request_duration_seconds_bucket{blueprint="app",endpoint="items",method="GET",le="+Inf"} 2'
+    )
+    assert metric_lines(text, "http_request_duration_seconds_count") == [
+        'http_request_duration_seconds_count{blueprint="app",endpoint="items",method="GET"} 2'
+    ]
+
+
+def test_status_and_db_totals_per_endpoint(client):
+    client.get("/api/items")
+    client.get("/api/missing")
+    text = instrumentation.render_prometheus()
+
+    assert metric_lines(text, "http_requests_total") == [
+        'http_requests_total{blueprint="app",endpoint="items",method="GET",status="200"} 1',
+        'http_requests_total{blueprint="app",endpoint="missing",method="GET",status="404"} 1',
+    ]
+    assert 'db_queries_total{blueprint="app",endpoint="items",method="GET"} 2' in text
+    assert 'db_query_seconds_total{blueprint="app",endpoint="items",method="GET"} 0.750000' in text
+    assert 'db_pool_wait_seconds_total{blueprint="app",endpoint="items",method="GET"} 0.250000' in text
+    assert 'db_queries_total{blueprint="app",endpoint="missing",method="GET"} 0' in text
+
+
+def test_every_metric_family_is_typed(client):
+    client.get("/api/items")
+    text = instrumentation.render_prometheus()
+
+    typed = {line.split(" ")[2] for line in text.splitlines() if line.startswith("# TYPE")}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name = line.split("{")[0].split(" ")[0]
+            assert name in typed or name.rsplit("_", 1)[0] in typed
+
+
+def test_pool_stats_are_exported():
+    stats = {
+        "max_size": 10, "in_use": 2, "idle": 3, "waiting": 0, "checkouts": 50, "timeouts": 1,
+        "recycled": 4, "failed_health_checks": 0, "total_wait_seconds": 0.5, "max_wait_seconds": 0.2,
+    }
+    text = instrumentation.render_prometheus(stats)
+
+    assert "db_pool_in_use 2" in text
+    assert "db_pool_checkouts_total 50" in text
+    assert "db_pool_checkout_wait_seconds_total 0.5" in text
+
+
+def test_label_values_are_escaped():
+    assert instrumentation._labels(("app", 'say "hi"\\', "GET"), le="a\nb") == (
+        'blueprint="app",endpoint="say \\"hi\\"\\\\",method="GET",le="a\\nb"'
+    )
@@ -0,0 +1,40 @@
+from flask import Flask
+import pytest
+from routes.colleges import colleges_bp
+from routes.programs import programs_bp
+from routes.students import students_bp
+from services.business import college_service, program_service, student_service
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(student_service.student_repository, "get_by_ids", lambda ids: [])
+    monkeypatch.setattr(college_service._cache, "get_many", lambda codes: [{"code": "CCS"}])
+    monkeypatch.setattr(program_service._cache, "get_many", lambda codes: [None])
+    app = Flask(__name__)
+    for blueprint in (students_bp, colleges_bp, programs_bp):
+        app.register_blueprint(blueprint)
+    return app.test_client()
+
+
+@pytest.mark.parametrize("path", ["/api/students/lookup", "/api/colleges/lookup", "/api/programs/lookup"])
+@pytest.mark.parametrize("body", [["CCS"], "CCS", 3])
+def test_non_object_body_is_a_400(client, path, body):
+    response = client.post(path, json=body)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Request body must be a JSON object"}
+
+
+@pytest.mark.parametrize("path", ["/api/students/lookup", "/api/colleges/lookup"])
+def test_missing_keys_are_a_400(client, path):
+    assert client.post(path, json={}).status_code == 400
+
+
+def test_lookup_orders_results_and_reports_missing(client):
+    assert client.post("/api/colleges/lookup", json={"codes": ["CCS"]}).get_json() == {
+        "results": [{"code": "CCS"}], "missing": [],
+    }
+    assert client.post("/api/programs/lookup", json={"codes": ["BSX"]}).get_json() == {
+        "results": [], "missing": ["BSX"],
+    }
@@ -0,0 +1,83 @@
+from datetime import date
+import pytest
+from services.business import metrics_service
+
+
+class FixedDate(date):
+    @classmethod
+    def today(cls):
+        return cls(2025, 3, 5)  # a Wednesday
+
+
+@pytest.fixture
+def buckets(monkeypatch):
+    """Fix today's date and capture the rollup query instead of running it."""
+    calls = []
+
+    def get_bucketed_counts(tables, bucket, start, end):
+        calls.append((bucket, start, end))
+        return [
+            {"table_name": "students", "bucket": date(2025, 3, 3), "count": 4},
+            {"table_name": "users", "bucket": "2025-03-05", "count": 1},
+            {"table_name": "colleges", "bucket": date(2024, 1, 1), "count": 9},
+        ]
+
+    monkeypatch.setattr(metrics_service, "date", FixedDate)
+    monkeypatch.setattr(metrics_service.metrics_repository, "get_bucketed_counts", get_bucketed_counts)
+    return calls
+
+
+@pytest.mark.parametrize("day, bucket, start", [
+    (date(2025, 3, 5), "day", date(2025, 3, 5)),
+    (date(2025, 3, 5), "week", date(2025, 3, 3)),
+    (date(2025, 3, 3), "week", date(2025, 3, 3)),
+    (date(2025, 3, 9), "week", date(2025, 3, 3)),
+    (date(2025, 3, 31), "month", date(2025, 3, 1)),
+])
+def test_bucket_start(day, bucket, start):
+    assert metrics_service._bucket_start(day, bucket) == start
+
+
+@pytest.mark.parametrize("day, bucket, following", [
+    (date(2024, 2, 28), "day", date(2024, 2, 29)),
+    (date(2025, 3, 3), "week", date(2025, 3, 10)),
+    (date(2024, 1, 1), "month", date(2024, 2, 1)),
+    (date(2024, 2, 1), "month", date(2024, 3, 1)),
+    (date(2024, 12, 1), "month", date(2025, 1, 1)),
+])
+def test_next_bucket(day, bucket, following):
+    assert metrics_service._next_bucket(day, bucket) == following
+
+
+def test_daily_window_ends_today(buckets):
+    result = metrics_service.get_daily_metrics(days=3)
+
+    assert [row["date"] for row in result] == ["2025-03-03", "2025-03-04", "2025-03-05"]
+    assert buckets == [("day", "2025-03-03", "2025-03-06")]
+    assert result[0]["students"] == 4
+    assert result[2]["users"] == 1
+    assert all(row["college"] == 0 for row in result)
+
+
+def test_single_day_window(buckets):
+    result = metrics_service.get_daily_metrics(days=1)
+    assert [row["date"] for row in result] == ["2025-03-05"]
+
+
+def test_weekly_window_starts_on_monday(buckets):
+    result = metrics_service.get_daily_metrics(days=10, bucket="week")
+
+    assert [row["date"] for row in result] == ["2025-02-24", "2025-03-03"]
+    assert buckets[0][1] == "2025-02-24"
+
+
+def test_monthly_window_spans_year_boundary(buckets):
+    result = metrics_service.get_daily_metrics(days=90, bucket="month")
+    assert [row["date"] for row in result] == ["2024-12-01", "2025-01-01", "2025-02-01", "2025-03-01"]
+
+
+@pytest.mark.parametrize("days, bucket", [(0, "day"), (367, "day"), (7, "year")])
+def test_invalid_window_is_rejected(buckets, days, bucket):
+    with pytest.raises(ValueError):
+        metrics_service.get_daily_metrics(days=days, bucket=bucket)
+    assert buckets == []
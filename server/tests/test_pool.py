@@ -0,0 +1,172 @@
+import threading
+import time
+import pytest
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+from services import pool as pool_module
+from services.pool import BlockingConnectionPool
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        if not self._conn.alive:
+            raise OSError("server closed the connection")
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.alive = True
+        self.info = FakeInfo()
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        pass
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Replace psycopg2.connect with a factory of fake connections and record them."""
+    opened = []
+
+    def connect(dsn, connection_factory=None):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(pool_module.psycopg2, "connect", connect)
+    return opened
+
+
+def make_pool(**kwargs):
+    options = {"minconn": 0, "maxconn": 1, "timeout": 1.0, "ping_after": 60.0}
+    options.update(kwargs)
+    return BlockingConnectionPool("dbname=test", **options)
+
+
+def test_reuses_returned_connection(connections):
+    pool = make_pool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    assert pool.getconn() is conn
+    assert len(connections) == 1
+
+
+def test_getconn_blocks_until_a_connection_is_returned(connections):
+    pool = make_pool(timeout=2.0)
+    conn = pool.getconn()
+    threading.Timer(0.1, pool.putconn, args=(conn,)).start()
+
+    started = time.monotonic()
+    assert pool.getconn() is conn
+    assert time.monotonic() - started >= 0.05
+    assert pool.stats()["max_wait_seconds"] > 0
+
+
+def test_getconn_times_out_when_pool_is_exhausted(connections):
+    pool = make_pool(timeout=0.05)
+    pool.getconn()
+
+    with pytest.raises(PoolError):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_putconn_with_close_discards_connection(connections):
+    pool = make_pool()
+    conn = pool.getconn()
+    pool.putconn(conn, close=True)
+
+    assert conn.closed
+    assert pool.getconn() is not conn
+    assert len(connections) == 2
+
+
+def test_closed_idle_connection_is_recycled(connections):
+    pool = make_pool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.closed = 2  # dropped by the server while idle
+
+    assert pool.getconn() is not conn
+    assert pool.stats()["recycled"] == 1
+
+
+def test_closeall_refuses_further_checkouts(connections):
+    pool = make_pool()
+    pool.putconn(pool.getconn())
+    pool.closeall()
+
+    assert all(conn.closed for conn in connections)
+    with pytest.raises(PoolError):
+        pool.getconn()
+
+
+def test_stale_idle_connections_are_pruned_on_return(connections, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pool_module.time, "monotonic", lambda: now[0])
+    pool = make_pool(maxconn=3, max_idle=300.0, max_age=0)
+    oldest, middle, newest = pool.getconn(), pool.getconn(), pool.getconn()
+    pool.putconn(oldest)
+    now[0] += 200
+    pool.putconn(middle)
+    now[0] += 200
+
+    # Only the most recently returned connection is ever checked out again
+    pool.putconn(newest)
+    assert oldest.closed
+    assert not middle.closed
+    assert pool.stats()["idle"] == 2
+
+    now[0] += 200
+    assert pool.getconn() is newest
+    assert middle.closed
+    assert pool.stats()["recycled"] == 2
+
+
+def test_connections_past_max_age_are_pruned(connections, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pool_module.time, "monotonic", lambda: now[0])
+    pool = make_pool(maxconn=2, max_age=1800.0, max_idle=0)
+    old = pool.getconn()
+    now[0] += 1000
+    young = pool.getconn()
+    pool.putconn(old)
+    pool.putconn(young)
+
+    now[0] += 900
+    assert pool.getconn() is young
+    assert old.closed
+
+
+def test_dead_idle_connection_fails_health_check(connections, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pool_module.time, "monotonic", lambda: now[0])
+    pool = make_pool(ping_after=30.0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.alive = False
+
+    now[0] += 60
+    assert pool.getconn() is not conn
+    assert conn.closed
+    assert pool.stats()["failed_health_checks"] == 1
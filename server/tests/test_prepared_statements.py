@@ -0,0 +1,126 @@
+import pytest
+from psycopg2 import errors, extensions
+from services import database
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self, autocommit=True):
+        self.autocommit = autocommit
+        self.info = FakeInfo()
+        self.prepared = set()
+
+
+class FakeCursor:
+    """Records executed statements; `fail` maps a statement prefix to the error it raises."""
+
+    def __init__(self, conn, fail=None):
+        self.connection = conn
+        self.fail = fail or {}
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        for prefix, error in self.fail.items():
+            if sql.startswith(prefix):
+                raise error
+
+
+@pytest.fixture
+def statement(monkeypatch):
+    monkeypatch.setattr(database, "_statements", {})
+    monkeypatch.setattr(database, "_prepared_statements_enabled", True)
+    return database.register_statement(
+        "get_student", 'SELECT * FROM students WHERE "idNo" = %s AND name LIKE \'a%%\' AND year = %s'
+    )
+
+
+def test_placeholders_are_numbered(statement):
+    query, prepared_query, count = database._statements[statement]
+
+    assert prepared_query == 'SELECT * FROM students WHERE "idNo" = $1 AND name LIKE \'a%\' AND year = $2'
+    assert count == 2
+    assert "%s" in query
+
+
+def test_escaped_percent_before_s_stays_literal(monkeypatch):
+    monkeypatch.setattr(database, "_statements", {})
+    database.register_statement("like_s", "SELECT 1 WHERE a LIKE '%%s' AND b = %s")
+    assert database._statements["like_s"][1:] == ("SELECT 1 WHERE a LIKE '%s' AND b = $1", 1)
+
+
+@pytest.mark.parametrize("name", ["Get", "1st", "drop table", "a-b"])
+def test_invalid_statement_names_are_rejected(name):
+    with pytest.raises(ValueError, match="Invalid statement name"):
+        database.register_statement(name, "SELECT 1")
+
+
+def test_named_placeholders_are_rejected():
+    with pytest.raises(ValueError, match="Named placeholders"):
+        database.register_statement("named", "SELECT %(id)s")
+
+
+def test_prepares_once_then_executes(statement):
+    cur = FakeCursor(FakeConnection())
+    database.execute_prepared(cur, statement, ("1", 2))
+    database.execute_prepared(cur, statement, ("3", 4))
+
+    assert [sql.split(" ")[0] for sql, _ in cur.executed] == ["PREPARE", "EXECUTE", "EXECUTE"]
+    assert cur.executed[1] == ("EXECUTE get_student(%s, %s)", ("1", 2))
+
+
+def test_prepare_inside_transaction_uses_savepoint(statement):
+    cur = FakeCursor(FakeConnection(autocommit=False))
+    database.execute_prepared(cur, statement, ("1", 2))
+
+    assert [sql.split(" ")[0] for sql, _ in cur.executed] == ["SAVEPOINT", "PREPARE", "RELEASE", "EXECUTE"]
+
+
+def test_duplicate_name_falls_back_to_plain_execute(statement):
+    cur = FakeCursor(FakeConnection(autocommit=False), fail={"PREPARE": errors.DuplicatePreparedStatement()})
+    database.execute_prepared(cur, statement, ("1", 2))
+
+    assert [sql.split(" ")[0] for sql, _ in cur.executed] == ["SAVEPOINT", "PREPARE", "ROLLBACK", "SELECT"]
+    assert statement not in cur.connection.prepared
+
+
+def test_forgotten_statement_outside_transaction_reruns_plain(statement):
+    conn = FakeConnection()
+    conn.prepared.update({statement, "other"})
+    cur = FakeCursor(conn, fail={"EXECUTE": errors.InvalidSqlStatementName()})
+    database.execute_prepared(cur, statement, ("1", 2))
+
+    assert cur.executed[-1][0].startswith("SELECT")
+    assert conn.prepared == {"other"}
+
+
+def test_forgotten_statement_inside_transaction_raises(statement):
+    conn = FakeConnection(autocommit=False)
+    conn.prepared.add(statement)
+    cur = FakeCursor(conn, fail={"EXECUTE": errors.InvalidSqlStatementName()})
+
+    with pytest.raises(errors.InvalidSqlStatementName):
+        database.execute_prepared(cur, statement, ("1", 2))
+    assert statement not in conn.prepared
+
+
+def test_disabled_runs_plain_query(statement, monkeypatch):
+    monkeypatch.setattr(database, "_prepared_statements_enabled", False)
+    cur = FakeCursor(FakeConnection())
+    database.execute_prepared(cur, statement, ("1", 2))
+
+    assert [sql.split(" ")[0] for sql, _ in cur.executed] == ["SELECT"]
+
+
+@pytest.mark.parametrize("url, enabled", [
+    ("postgresql://u:p@db.example.supabase.co:5432/postgres", True),
+    ("postgresql://u:p@pooler.supabase.com:6543/postgres", False),
+])
+def test_transaction_pooler_port_disables_prepared_statements(monkeypatch, url, enabled):
+    monkeypatch.setattr(database, "_prepared_statements_enabled", None)
+    monkeypatch.setattr(database, "PREPARED_STATEMENTS_REQUESTED", True)
+    monkeypatch.setenv("DATABASE_URL", url)
+    assert database.prepared_statements_enabled() is enabled
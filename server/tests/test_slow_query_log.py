@@ -0,0 +1,91 @@
+import pytest
+from services import slow_query_log
+
+
+class FakeCursor:
+    def __init__(self, name=None, rowcount=3):
+        self.name = name
+        self.rowcount = rowcount
+
+
+@pytest.fixture
+def log(monkeypatch):
+    """Enable the log with a 100 ms threshold, an empty buffer and no EXPLAIN worker."""
+    monkeypatch.setattr(slow_query_log, "THRESHOLD_SECONDS", 0.1)
+    monkeypatch.setattr(slow_query_log, "EXPLAIN_RATE", 0.0)
+    monkeypatch.setattr(slow_query_log, "LOG_RAW_PARAMS", False)
+    monkeypatch.setattr(slow_query_log, "_entries", slow_query_log.deque(maxlen=2))
+    monkeypatch.setattr(slow_query_log, "_explain_queue", slow_query_log.queue.Queue(maxsize=1))
+    monkeypatch.setattr(slow_query_log, "_worker", object())  # never start the real thread
+    return slow_query_log
+
+
+@pytest.mark.parametrize("query, normalized", [
+    ("SELECT *\n  FROM students\tWHERE year = 3", "SELECT * FROM students WHERE year = ?"),
+    ("SELECT 1 WHERE name = 'O''Brien' AND x = 2.5", "SELECT ? WHERE name = ? AND x = ?"),
+    ('SELECT "col2", t1.a FROM t1', 'SELECT "col2", t1.a FROM t1'),
+    ("EXECUTE student_get_by_id($1) LIMIT 10", "EXECUTE student_get_by_id($1) LIMIT ?"),
+    (b"SELECT  'a' ", "SELECT ?"),
+])
+def test_normalize_sql(query, normalized):
+    assert slow_query_log.normalize_sql(query) == normalized
+
+
+def test_params_are_redacted(log):
+    assert log.redact_params(("secret", 3, None, True, [1, 2], 2.5)) == [
+        "<str len=6>", 3, None, True, "<list len=2>", 2.5,
+    ]
+    assert log.redact_params({"email": "a@b.c"}) == {"email": "<str len=5>"}
+    assert log.redact_params(None) is None
+
+
+def test_raw_params_when_enabled(log, monkeypatch):
+    monkeypatch.setattr(log, "LOG_RAW_PARAMS", True)
+    assert log.redact_params(("secret",)) == ["secret"]
+
+
+def test_fast_queries_are_ignored(log):
+    log.check(FakeCursor(), "SELECT 1", None, 0.05)
+    assert log.get_entries() == []
+
+
+def test_slow_query_is_buffered_newest_first(log):
+    for index in range(3):
+        log.check(FakeCursor(rowcount=index), f"SELECT * FROM t WHERE id = {index}", ("x",), 0.2)
+
+    entries = log.get_entries()
+    assert [e["rows"] for e in entries] == [2, 1]
+    assert entries[0]["sql"] == "SELECT * FROM t WHERE id = ?"
+    assert entries[0]["params"] == ["<str len=1>"]
+    assert entries[0]["duration_ms"] == 200.0
+    assert entries[0]["plan"] is None
+
+
+def test_sampled_select_is_queued_for_explain(log, monkeypatch):
+    monkeypatch.setattr(log, "EXPLAIN_RATE", 1.0)
+    monkeypatch.setattr(log, "_entries", log.deque(maxlen=10))
+    log.check(FakeCursor(), "SELECT 1", None, 0.2)
+    log.check(FakeCursor(), "SELECT 2", None, 0.2)
+    log.check(FakeCursor(), "UPDATE t SET a = 1", None, 0.2)
+    log.check(FakeCursor(name="stream_cursor"), "SELECT 3", None, 0.2)
+
+    assert [e["plan"] for e in log.get_entries()] == [
+        None, None, "EXPLAIN skipped: queue full", "EXPLAIN pending",
+    ]
+    entry, text, params = log._explain_queue.get_nowait()
+    assert text == "SELECT 1"
+
+
+def test_explain_worker_queries_are_not_logged(log):
+    log._worker_state.active = True
+    try:
+        log.check(FakeCursor(), "SELECT 1", None, 1.0)
+    finally:
+        log._worker_state.active = False
+    assert log.get_entries() == []
+
+
+def test_entries_are_copies(log):
+    log.check(FakeCursor(), "SELECT 1", None, 0.2)
+    log.get_entries()[0]["plan"] = "changed"
+    assert log.get_entries()[0]["plan"] is None
@@ -0,0 +1,137 @@
+import gzip
+from flask import Flask
+import pytest
+from services import static_assets
+
+SCRIPT = b"console.log('maktab');\n" * 200
+
+
+@pytest.fixture
+def build(tmp_path):
+    """A small client export with hashed assets, route pages and a prebuilt variant."""
+    (tmp_path / "index.html").write_bytes(b"<html>home</html>")
+    (tmp_path / "students").mkdir()
+    (tmp_path / "students" / "index.html").write_bytes(b"<html>students</html>")
+    (tmp_path / "_next" / "static").mkdir(parents=True)
+    (tmp_path / "_next" / "static" / "app.js").write_bytes(SCRIPT)
+    (tmp_path / "style.css").write_bytes(b"body { color: red; }\n" * 100)
+    (tmp_path / "style.css.gz").write_bytes(b"prebuilt")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 4000)
+    return tmp_path
+
+
+@pytest.fixture
+def manifest(build):
+    return static_assets.build_manifest(str(build))
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def test_manifest_lists_files_but_not_variants(manifest):
+    assert sorted(manifest) == [
+        "_next/static/app.js", "index.html", "logo.png", "students/index.html", "style.css",
+    ]
+
+
+def test_missing_build_gives_empty_manifest(tmp_path):
+    assert static_assets.build_manifest(str(tmp_path / "missing")) == {}
+
+
+def test_asset_metadata(manifest):
+    asset = manifest["_next/static/app.js"]
+
+    assert asset.size == len(SCRIPT)
+    assert asset.body == SCRIPT
+    assert "javascript" in asset.mimetype
+    assert asset.cache_control == static_assets.IMMUTABLE_CACHE_CONTROL
+    assert manifest["index.html"].cache_control == static_assets.REVALIDATE_CACHE_CONTROL
+
+
+def test_compressible_assets_get_variants(manifest):
+    asset = manifest["_next/static/app.js"]
+
+    assert gzip.decompress(asset.variants["gzip"]) == SCRIPT
+    assert "gzip" not in manifest["index.html"].variants  # below MIN_COMPRESS_BYTES
+    assert manifest["logo.png"].variants == {}
+
+
+def test_prebuilt_variant_is_used(manifest):
+    assert manifest["style.css"].variants["gzip"] == b"prebuilt"
+
+
+def test_brotli_uses_configured_quality(build, monkeypatch):
+    calls = []
+
+    class FakeBrotli:
+        @staticmethod
+        def compress(content, quality=11):
+            calls.append(quality)
+            return b"br"
+
+    monkeypatch.setattr(static_assets, "brotli", FakeBrotli)
+    monkeypatch.setattr(static_assets, "BR_QUALITY", 4)
+    manifest = static_assets.build_manifest(str(build))
+
+    assert manifest["_next/static/app.js"].variants["br"] == b"br"
+    assert calls and set(calls) == {4}
+
+
+def test_large_files_stay_on_disk(build, monkeypatch):
+    monkeypatch.setattr(static_assets, "MAX_IN_MEMORY_BYTES", 1000)
+    asset = static_assets.build_manifest(str(build))["_next/static/app.js"]
+
+    assert asset.body is None
+    assert asset.variants == {}
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("_next/static/app.js", "_next/static/app.js"),
+    ("/students/", "students/index.html"),
+    ("students", "students/index.html"),
+    ("", "index.html"),
+    ("colleges/CCS", "index.html"),
+])
+def test_resolve(manifest, path, expected):
+    assert static_assets.resolve(manifest, path) is manifest[expected]
+
+
+def test_serve_negotiates_encoding(app, build, monkeypatch):
+    monkeypatch.setattr(static_assets, "brotli", None)
+    asset = static_assets.build_manifest(str(build))["_next/static/app.js"]
+    with app.test_request_context(headers={"Accept-Encoding": "gzip, br"}):
+        response = static_assets.serve(asset)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == f'"{asset.etag}-gzip"'
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["Cache-Control"] == static_assets.IMMUTABLE_CACHE_CONTROL
+
+
+def test_serve_prefers_brotli(app, manifest):
+    pytest.importorskip("brotli")
+    with app.test_request_context(headers={"Accept-Encoding": "gzip, br"}):
+        response = static_assets.serve(manifest["_next/static/app.js"])
+    assert response.headers["Content-Encoding"] == "br"
+
+
+def test_serve_identity_and_304(app, manifest):
+    asset = manifest["_next/static/app.js"]
+    with app.test_request_context():
+        response = static_assets.serve(asset)
+        assert response.get_data() == SCRIPT
+        assert "Content-Encoding" not in response.headers
+
+    with app.test_request_context(headers={"If-None-Match": f'"{asset.etag}"'}):
+        assert static_assets.serve(asset).status_code == 304
+
+
+def test_serve_large_file_from_disk(app, build, monkeypatch):
+    monkeypatch.setattr(static_assets, "MAX_IN_MEMORY_BYTES", 1000)
+    asset = static_assets.build_manifest(str(build))["_next/static/app.js"]
+    with app.test_request_context():
+        response = static_assets.serve(asset)
+        response.direct_passthrough = False
+        assert response.get_data() == SCRIPT
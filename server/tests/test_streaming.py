@@ -0,0 +1,115 @@
+import json
+from flask import Flask
+import pytest
+from services import streaming
+
+
+class Rows:
+    """A row source that records how far it was read and whether it was closed."""
+
+    def __init__(self, rows, fail_at=None):
+        self._rows = list(rows)
+        self.fail_at = fail_at
+        self.fetched = 0
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.fetched == self.fail_at:
+            raise RuntimeError("query failed")
+        if self.fetched >= len(self._rows):
+            raise StopIteration
+        self.fetched += 1
+        return self._rows[self.fetched - 1]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def test_primed_fetches_first_row_eagerly():
+    rows = Rows([{"id": 1}, {"id": 2}])
+    primed = streaming._primed(rows)
+
+    assert rows.fetched == 1
+    assert list(primed) == [{"id": 1}, {"id": 2}]
+
+
+def test_primed_raises_query_errors_immediately():
+    with pytest.raises(RuntimeError):
+        streaming._primed(Rows([], fail_at=0))
+
+
+def test_closing_unstarted_iterator_closes_source():
+    rows = Rows([{"id": 1}, {"id": 2}])
+    streaming._primed(rows).close()
+    assert rows.closed
+
+
+def test_closing_partly_read_iterator_closes_source():
+    rows = Rows([{"id": 1}, {"id": 2}, {"id": 3}])
+    primed = streaming._primed(rows)
+    next(primed)
+    primed.close()
+    assert rows.closed
+
+
+def test_empty_source_is_replayed_as_empty():
+    assert list(streaming._primed(Rows([]))) == []
+
+
+def client_for(app, rows):
+    @app.route("/api/students")
+    def students():
+        return streaming.stream_response(rows)
+    return app.test_client()
+
+
+def test_json_array_response(app):
+    rows = Rows([{"id": 1}, {"id": 2}])
+    response = client_for(app, rows).get("/api/students", buffered=True)
+
+    assert response.mimetype == "application/json"
+    assert response.get_json() == [{"id": 1}, {"id": 2}]
+    assert rows.closed
+
+
+def test_ndjson_response(app):
+    rows = Rows([{"id": 1}, {"id": 2}])
+    response = client_for(app, rows).get(
+        "/api/students", headers={"Accept": "application/x-ndjson"}, buffered=True
+    )
+
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [{"id": 1}, {"id": 2}]
+    assert rows.closed
+
+
+def test_response_closed_before_body_closes_source(app):
+    rows = Rows([{"id": 1}])
+    response = client_for(app, rows).get("/api/students", buffered=False)
+    response.close()
+    assert rows.closed
+
+
+def test_query_error_raises_before_response(app):
+    with app.test_request_context("/api/students"):
+        with pytest.raises(RuntimeError):
+            streaming.stream_response(Rows([], fail_at=0))
+
+
+@pytest.mark.parametrize("query, headers, expected", [
+    ("", {}, False),
+    ("?stream=1", {}, True),
+    ("?stream=true", {}, True),
+    ("", {"Accept": "application/x-ndjson"}, True),
+])
+def test_wants_stream(app, query, headers, expected):
+    with app.test_request_context(f"/api/students{query}", headers=headers):
+        assert streaming.wants_stream() is expected